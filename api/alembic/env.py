@@ -14,8 +14,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 
 # Импортируем модели
 from api.models.base import Base
-from api.models.products import Category, Product
-from api.models.orders import Client, Order, OrderItem
+from api.models.products import Category, Product, ProductStockShard
+from api.models.orders import PARTITION_NAME_RE, Client, ClientTotals, Order, OrderItem
+from api.models.sales import ProductSalesDaily, ProductSalesPending
 from api.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -34,6 +35,14 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """Секции orders/order_items создаются вне метаданных - не сравниваем их"""
+    if type_ == "table":
+        return not PARTITION_NAME_RE.match(name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -59,6 +68,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -70,6 +80,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,125 @@
+"""product sales rollup
+
+Revision ID: 3a7c9e2d4f16
+Revises: 8f4c2b7a91d3
+Create Date: 2026-10-17 11:40:17.121072
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c9e2d4f16'
+down_revision: Union[str, Sequence[str], None] = '8f4c2b7a91d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Копия api.models.sales.SALES_ROLLUP_DDL на момент миграции
+SALES_ROLLUP_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION order_items_sales_delta() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT i.product_id, o.created_at::date, SUM(i.quantity), SUM(i.quantity * i.price)
+            FROM new_items i
+            JOIN orders o ON o.id = i.order_id
+            GROUP BY i.product_id, o.created_at::date;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT i.product_id, o.created_at::date, -SUM(i.quantity), -SUM(i.quantity * i.price)
+            FROM old_items i
+            JOIN orders o ON o.id = i.order_id
+            GROUP BY i.product_id, o.created_at::date;
+        ELSE
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT i.product_id, o.created_at::date, SUM(i.quantity), SUM(i.revenue)
+            FROM (
+                SELECT order_id, product_id, quantity, quantity * price AS revenue
+                FROM new_items
+                UNION ALL
+                SELECT order_id, product_id, -quantity, -quantity * price
+                FROM old_items
+            ) i
+            JOIN orders o ON o.id = i.order_id
+            GROUP BY i.product_id, o.created_at::date
+            HAVING SUM(i.quantity) <> 0 OR SUM(i.revenue) <> 0;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_insert
+    AFTER INSERT ON order_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_update
+    AFTER UPDATE ON order_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_delete
+    AFTER DELETE ON order_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('product_sales_pending',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('product_sales_daily',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('quantity', sa.BigInteger(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.create_index('ix_product_sales_daily_day', 'product_sales_daily', ['day'], unique=False, postgresql_include=['product_id', 'quantity', 'revenue'])
+    # ### end Alembic commands ###
+
+    # Итоги по уже существующим заказам. Таблицу блокируем до создания
+    # триггеров, чтобы позиции, добавленные во время заполнения, не потерялись
+    op.execute("LOCK TABLE order_items IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO product_sales_daily (product_id, day, quantity, revenue)
+        SELECT oi.product_id, o.created_at::date, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        GROUP BY oi.product_id, o.created_at::date
+        """
+    )
+    for statement in SALES_ROLLUP_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER order_items_sales_delete ON order_items")
+    op.execute("DROP TRIGGER order_items_sales_update ON order_items")
+    op.execute("DROP TRIGGER order_items_sales_insert ON order_items")
+    op.execute("DROP FUNCTION order_items_sales_delta()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_product_sales_daily_day', table_name='product_sales_daily', postgresql_include=['product_id', 'quantity', 'revenue'])
+    op.drop_table('product_sales_daily')
+    op.drop_table('product_sales_pending')
+    # ### end Alembic commands ###
@@ -0,0 +1,134 @@
+"""category root, depth and path
+
+Revision ID: 5d0e8a1f3b2c
+Revises: b76f0928e748
+Create Date: 2026-10-17 12:41:05.204511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e8a1f3b2c'
+down_revision: Union[str, Sequence[str], None] = 'b76f0928e748'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Копия api.models.products.CATEGORY_TREE_DDL на момент миграции
+CATEGORY_TREE_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION categories_set_tree() RETURNS trigger AS $$
+    DECLARE
+        parent_root integer;
+        parent_depth integer;
+        parent_path varchar;
+    BEGIN
+        IF NEW.parent_id IS NULL THEN
+            NEW.root_category_id := NEW.id;
+            NEW.depth := 0;
+            NEW.path := '/' || NEW.id || '/';
+            RETURN NEW;
+        END IF;
+
+        SELECT root_category_id, depth, path
+        INTO parent_root, parent_depth, parent_path
+        FROM categories WHERE id = NEW.parent_id;
+        IF NOT FOUND THEN
+            RAISE foreign_key_violation
+                USING MESSAGE = format('parent category %s does not exist', NEW.parent_id);
+        END IF;
+        IF TG_OP = 'UPDATE' AND parent_path LIKE OLD.path || '%' THEN
+            RAISE check_violation
+                USING MESSAGE = format('category %s cannot be moved into its own subtree', NEW.id);
+        END IF;
+
+        NEW.root_category_id := parent_root;
+        NEW.depth := parent_depth + 1;
+        NEW.path := parent_path || NEW.id || '/';
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION categories_move_subtree() RETURNS trigger AS $$
+    BEGIN
+        UPDATE categories
+        SET path = NEW.path || substr(path, length(OLD.path) + 1),
+            depth = depth + NEW.depth - OLD.depth,
+            root_category_id = NEW.root_category_id
+        WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER categories_tree
+    BEFORE INSERT OR UPDATE OF parent_id ON categories
+    FOR EACH ROW EXECUTE FUNCTION categories_set_tree()
+    """,
+    """
+    CREATE TRIGGER categories_tree_move
+    AFTER UPDATE OF parent_id ON categories
+    FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path)
+    EXECUTE FUNCTION categories_move_subtree()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('root_category_id', sa.Integer(), nullable=True))
+    op.add_column('categories', sa.Column('depth', sa.Integer(), nullable=True))
+    op.add_column('categories', sa.Column('path', sa.String(), nullable=True))
+
+    # Заполняем существующее дерево одним рекурсивным обходом от корней
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, id AS root_id, 0 AS depth, '/' || id || '/' AS path
+            FROM categories
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, t.root_id, t.depth + 1, t.path || c.id || '/'
+            FROM categories c
+            JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE categories c
+        SET root_category_id = t.root_id, depth = t.depth, path = t.path
+        FROM tree t
+        WHERE c.id = t.id
+        """
+    )
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.alter_column('categories', 'root_category_id', nullable=False)
+    op.alter_column('categories', 'depth', nullable=False)
+    op.alter_column('categories', 'path', nullable=False)
+    op.create_index(op.f('ix_categories_root_category_id'), 'categories', ['root_category_id'], unique=False)
+    op.create_index('ix_categories_path', 'categories', ['path'], unique=False, postgresql_ops={'path': 'text_pattern_ops'})
+    op.create_foreign_key(None, 'categories', 'categories', ['root_category_id'], ['id'])
+    # ### end Alembic commands ###
+
+    for statement in CATEGORY_TREE_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER categories_tree_move ON categories")
+    op.execute("DROP TRIGGER categories_tree ON categories")
+    op.execute("DROP FUNCTION categories_move_subtree()")
+    op.execute("DROP FUNCTION categories_set_tree()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_constraint('categories_root_category_id_fkey', 'categories', type_='foreignkey')
+    op.drop_index('ix_categories_path', table_name='categories', postgresql_ops={'path': 'text_pattern_ops'})
+    op.drop_index(op.f('ix_categories_root_category_id'), table_name='categories')
+    op.drop_column('categories', 'path')
+    op.drop_column('categories', 'depth')
+    op.drop_column('categories', 'root_category_id')
+    # ### end Alembic commands ###
@@ -0,0 +1,216 @@
+"""order and client totals
+
+Revision ID: 6b1d4f8e2a57
+Revises: 3a7c9e2d4f16
+Create Date: 2026-10-17 11:44:17.954342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1d4f8e2a57'
+down_revision: Union[str, Sequence[str], None] = '3a7c9e2d4f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Копия api.models.orders.ORDER_TOTALS_DDL на момент миграции
+ORDER_TOTALS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION order_items_order_totals() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM 1 FROM orders
+            WHERE id IN (SELECT order_id FROM new_items)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity + d.quantity,
+                total_amount = o.total_amount + d.amount
+            FROM (
+                SELECT order_id, SUM(quantity) AS quantity, SUM(quantity * price) AS amount
+                FROM new_items
+                GROUP BY order_id
+            ) d
+            WHERE o.id = d.order_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM 1 FROM orders
+            WHERE id IN (SELECT order_id FROM old_items)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity - d.quantity,
+                total_amount = o.total_amount - d.amount
+            FROM (
+                SELECT order_id, SUM(quantity) AS quantity, SUM(quantity * price) AS amount
+                FROM old_items
+                GROUP BY order_id
+            ) d
+            WHERE o.id = d.order_id;
+        ELSE
+            PERFORM 1 FROM orders
+            WHERE id IN (SELECT order_id FROM new_items UNION SELECT order_id FROM old_items)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity + d.quantity,
+                total_amount = o.total_amount + d.amount
+            FROM (
+                SELECT order_id, SUM(quantity) AS quantity, SUM(amount) AS amount
+                FROM (
+                    SELECT order_id, quantity, quantity * price AS amount FROM new_items
+                    UNION ALL
+                    SELECT order_id, -quantity, -quantity * price FROM old_items
+                ) changes
+                GROUP BY order_id
+                HAVING SUM(quantity) <> 0 OR SUM(amount) <> 0
+            ) d
+            WHERE o.id = d.order_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION orders_client_totals() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, COUNT(*), SUM(total_quantity), SUM(total_amount)
+            FROM new_orders
+            GROUP BY client_id
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, -COUNT(*), -SUM(total_quantity), -SUM(total_amount)
+            FROM old_orders
+            GROUP BY client_id
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        ELSE
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, SUM(orders_count), SUM(total_quantity), SUM(total_amount)
+            FROM (
+                SELECT client_id, 1 AS orders_count, total_quantity, total_amount FROM new_orders
+                UNION ALL
+                SELECT client_id, -1, -total_quantity, -total_amount FROM old_orders
+            ) changes
+            GROUP BY client_id
+            HAVING SUM(orders_count) <> 0 OR SUM(total_quantity) <> 0 OR SUM(total_amount) <> 0
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_insert
+    AFTER INSERT ON order_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_update
+    AFTER UPDATE ON order_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_delete
+    AFTER DELETE ON order_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_insert
+    AFTER INSERT ON orders
+    REFERENCING NEW TABLE AS new_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_update
+    AFTER UPDATE ON orders
+    REFERENCING OLD TABLE AS old_orders NEW TABLE AS new_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_delete
+    AFTER DELETE ON orders
+    REFERENCING OLD TABLE AS old_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('client_totals',
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.BigInteger(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('client_id')
+    )
+    op.create_index('ix_client_totals_total_amount', 'client_totals', ['total_amount', 'client_id'], unique=False)
+    op.add_column('orders', sa.Column('total_quantity', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('orders', sa.Column('total_amount', sa.Numeric(precision=14, scale=2), server_default=sa.text('0'), nullable=False))
+    # ### end Alembic commands ###
+
+    # Итоги по существующим заказам. Таблицы блокируем до создания триггеров,
+    # чтобы изменения во время заполнения не потерялись
+    op.execute("LOCK TABLE orders, order_items IN SHARE MODE")
+    op.execute(
+        """
+        UPDATE orders o
+        SET total_quantity = t.quantity, total_amount = t.amount
+        FROM (
+            SELECT order_id, SUM(quantity) AS quantity, SUM(quantity * price) AS amount
+            FROM order_items
+            GROUP BY order_id
+        ) t
+        WHERE o.id = t.order_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO client_totals (client_id, orders_count, total_quantity, total_amount)
+        SELECT client_id, COUNT(*), SUM(total_quantity), SUM(total_amount)
+        FROM orders
+        GROUP BY client_id
+        """
+    )
+    for statement in ORDER_TOTALS_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, trigger in [
+        ("orders", "orders_client_totals"),
+        ("order_items", "order_items_totals"),
+    ]:
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER {trigger}_{event} ON {table}")
+    op.execute("DROP FUNCTION orders_client_totals()")
+    op.execute("DROP FUNCTION order_items_order_totals()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column('orders', 'total_amount')
+    op.drop_column('orders', 'total_quantity')
+    op.drop_index('ix_client_totals_total_amount', table_name='client_totals')
+    op.drop_table('client_totals')
+    # ### end Alembic commands ###
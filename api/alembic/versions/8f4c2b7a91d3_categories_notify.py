@@ -0,0 +1,46 @@
+"""categories change notifications
+
+Revision ID: 8f4c2b7a91d3
+Revises: 5d0e8a1f3b2c
+Create Date: 2026-10-17 13:20:47.618290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4c2b7a91d3'
+down_revision: Union[str, Sequence[str], None] = '5d0e8a1f3b2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY для индекса дерева категорий в памяти API (CategoryTreeIndex)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION categories_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('categories_changed', '');
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER categories_notify
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+        FOR EACH STATEMENT EXECUTE FUNCTION categories_notify()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER categories_notify ON categories")
+    op.execute("DROP FUNCTION categories_notify()")
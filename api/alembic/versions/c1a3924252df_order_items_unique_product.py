@@ -0,0 +1,56 @@
+"""order items unique product
+
+Revision ID: c1a3924252df
+Revises: caad4c293ca3
+Create Date: 2026-10-17 10:12:40.512931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1a3924252df'
+down_revision: Union[str, Sequence[str], None] = 'caad4c293ca3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Схлопываем дубли позиций (order_id, product_id), которые могли появиться
+    # при параллельных запросах: количество переносим в позицию с минимальным id
+    op.execute(
+        """
+        WITH duplicates AS (
+            SELECT
+                id,
+                MIN(id) OVER (PARTITION BY order_id, product_id) AS keep_id,
+                SUM(quantity) OVER (PARTITION BY order_id, product_id) AS total_quantity
+            FROM order_items
+        )
+        UPDATE order_items oi
+        SET quantity = d.total_quantity
+        FROM duplicates d
+        WHERE oi.id = d.id AND d.id = d.keep_id AND d.total_quantity <> oi.quantity
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM order_items oi
+        USING order_items keep
+        WHERE keep.order_id = oi.order_id
+          AND keep.product_id = oi.product_id
+          AND keep.id < oi.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_order_items_order_product', 'order_items', ['order_id', 'product_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_order_items_order_product', 'order_items', type_='unique')
@@ -0,0 +1,40 @@
+from api.core.config import settings
+from .backends import (
+    CacheStats,
+    CacheBackend,
+    NullCache,
+    InMemoryLRUCache,
+    RedisCache,
+    create_cache,
+)
+
+# Кэш ответов GET /orders/{order_id}
+order_cache = create_cache(
+    settings.ORDER_CACHE_BACKEND,
+    ttl=settings.ORDER_CACHE_TTL,
+    max_size=settings.ORDER_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+)
+
+
+def get_order_cache() -> CacheBackend:
+    """Dependency для получения кэша заказов"""
+    return order_cache
+
+
+def order_cache_key(order_id: int) -> str:
+    """Ключ кэша заказа"""
+    return f"order:{order_id}"
+
+
+__all__ = [
+    "CacheStats",
+    "CacheBackend",
+    "NullCache",
+    "InMemoryLRUCache",
+    "RedisCache",
+    "create_cache",
+    "order_cache",
+    "get_order_cache",
+    "order_cache_key",
+]
@@ -0,0 +1,160 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    """Счетчики кэша для подбора размера и TTL"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # вытеснены из-за ограничения размера
+    expirations: int = 0  # удалены по истечении TTL
+    invalidations: int = 0  # удалены при изменении данных
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend(ABC):
+    """Кэш сериализованных ответов (ключ - строка, значение - байты)"""
+
+    name: str
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Значение по ключу или None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        """Сохраняет значение на ttl секунд"""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Инвалидирует ключи"""
+
+    @property
+    def size(self) -> int | None:
+        """Количество записей, если оно известно"""
+        return None
+
+
+class NullCache(CacheBackend):
+    """Кэш выключен: всегда промах"""
+
+    name = "none"
+
+    async def get(self, key: str) -> bytes | None:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+
+class InMemoryLRUCache(CacheBackend):
+    """
+    LRU-кэш в памяти процесса с TTL и ограничением количества записей.
+
+    Инвалидация действует только в текущем процессе: при нескольких
+    воркерах другие воркеры могут отдавать устаревшие данные до истечения TTL.
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl: float, max_size: int):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisCache(CacheBackend):
+    """
+    Кэш в Redis (или совместимом хранилище).
+
+    `client` - асинхронный клиент с методами get(key), set(key, value, ex=...)
+    и delete(*keys), например redis.asyncio.Redis. Вытеснение выполняет сам
+    Redis, поэтому evictions/expirations здесь не считаются.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, ttl: float, prefix: str = "aiti:"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.client.get(self.prefix + key)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(1, round(self.ttl)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            deleted = await self.client.delete(*(self.prefix + key for key in keys))
+            self.stats.invalidations += deleted or 0
+
+
+def create_cache(backend: str, ttl: float, max_size: int, redis_url: str) -> CacheBackend:
+    """Создает кэш по настройкам"""
+    if backend == "memory":
+        return InMemoryLRUCache(ttl=ttl, max_size=max_size)
+    if backend == "redis":
+        # redis - опциональная зависимость, нужна только для этого backend
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "ORDER_CACHE_BACKEND=redis требует установленного пакета redis"
+            ) from exc
+        return RedisCache(Redis.from_url(redis_url), ttl=ttl)
+    return NullCache(ttl=ttl)
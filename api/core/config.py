@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,11 +14,77 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
     
+    # Пул соединений и asyncpg (см. api/db/connection.py::create_engine)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # секунды ожидания свободного соединения
+    DB_POOL_RECYCLE: int = 1800  # секунды, -1 - не пересоздавать
+    # Проверка соединения при выдаче из пула: "always" - на каждую выдачу
+    # (лишний запрос к БД), "never", "idle" - только после простоя
+    # дольше DB_PRE_PING_IDLE секунд
+    DB_PRE_PING: Literal["always", "never", "idle"] = "idle"
+    DB_PRE_PING_IDLE: float = 30.0
+    DB_STATEMENT_CACHE_SIZE: int = 100  # подготовленных выражений на соединение
+    # PgBouncer в режиме transaction pooling: без кэша подготовленных выражений
+    DB_PGBOUNCER: bool = False
+    DB_STATEMENT_TIMEOUT: int = 0  # мс, 0 - без ограничения
+    
+    # Реплики для чтения (в env - JSON-список: DB_REPLICA_URLS='["postgresql+asyncpg://..."]').
+    # GET-эндпоинты читают с реплик, клиент после записи DB_STICKY_PRIMARY_SECONDS
+    # секунд читает из primary (cookie), чтобы видеть свои изменения
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_STICKY_PRIMARY_SECONDS: float = 5.0
+    
     # API
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "AITI Guru Test API"
     DEBUG: bool = True
     
+    # Заказы
+    # Режим добавления товара в заказ:
+    # - "atomic" - один SQL-запрос (CTE) с условным UPDATE остатка и UPSERT позиции
+    # - "orm" - прежняя реализация через ORM (SELECT заказа, товара и позиции)
+    # - "coalesced" - списание остатков через движок резервирования, который
+    #   объединяет параллельные списания одного товара в один UPDATE за тик
+    # - "sharded" - списание со случайного шарда счетчика остатка
+    #   (product_stock_shards), для товаров без шардов - с products.quantity
+    ADD_ITEM_MODE: Literal["atomic", "orm", "coalesced", "sharded"] = "atomic"
+    
+    # Движок резервирования остатков (ADD_ITEM_MODE="coalesced")
+    STOCK_FLUSH_INTERVAL: float = 0.005  # секунды между сбросами очереди
+    STOCK_FLUSH_MAX_BATCH: int = 500  # сброс сразу при накоплении запросов
+    
+    # Чтение заказа (GET /orders/{order_id}):
+    # - "json" - один запрос, JSON собирается в PostgreSQL (json_agg), без ORM
+    # - "orm" - ORM-объекты Order/OrderItem (selectinload, два запроса)
+    ORDER_READ_MODE: Literal["json", "orm"] = "json"
+    
+    # Кэш GET /orders/{order_id}: "none" - выключен, "memory" - LRU в процессе,
+    # "redis" - общий кэш воркеров (нужен пакет redis)
+    ORDER_CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    ORDER_CACHE_TTL: float = 5.0  # секунды
+    ORDER_CACHE_MAX_SIZE: int = 10_000  # записей (для memory)
+    REDIS_URL: str = "redis://redis:6379/0"
+    
+    # Отчеты: период переноса журнала продаж (product_sales_pending)
+    # в дневные итоги product_sales_daily, секунды
+    SALES_ROLLUP_INTERVAL: float = 5.0
+    
+    # Сверка итогов клиентов и заказов (POST /admin/client-totals/reconcile):
+    # клиентов в одной части и число частей, проверяемых параллельно
+    RECONCILE_CHUNK_SIZE: int = 10_000
+    RECONCILE_CONCURRENCY: int = 4
+    
+    # Месячные секции orders/order_items (api/services/partitions.py):
+    # на сколько месяцев вперед создавать секции, сколько месяцев хранить
+    # (0 - не архивировать), схема для отсоединенных секций и период
+    # проверки, секунды
+    ORDERS_PARTITIONS_AHEAD: int = 3
+    ORDERS_RETENTION_MONTHS: int = 0
+    ORDERS_ARCHIVE_SCHEMA: str = "archive"
+    ORDERS_PARTITIONS_INTERVAL: float = 3600.0
+    
     @property
     def database_url(self) -> str:
         """Формирование URL подключения к БД"""
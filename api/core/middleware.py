@@ -0,0 +1,31 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.db.statements import count_statements
+
+
+class SQLStatementsMiddleware:
+    """
+    Считает обращения к БД за HTTP-запрос и отдает их в заголовке
+    X-SQL-Statements (SQL-запросы вместе с BEGIN/COMMIT/ROLLBACK).
+
+    Заголовок отправляется в начале ответа, поэтому не включает то, что
+    выполняется после отправки ответа (закрытие dependency с yield).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_statements() as counter:
+            async def send_with_header(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-SQL-Statements"] = str(counter.total)
+                await send(message)
+
+            await self.app(scope, receive, send_with_header)
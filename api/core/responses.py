@@ -0,0 +1,33 @@
+from functools import cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+@cache
+def _type_adapter(type_: type) -> TypeAdapter:
+    """TypeAdapter (скомпилированный сериализатор pydantic-core) на каждый тип"""
+    return TypeAdapter(type_)
+
+
+def dump_json(content: Any) -> bytes:
+    """Сериализует значение (модель, список моделей, dict...) в JSON-байты"""
+    return _type_adapter(type(content)).dump_json(content)
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый напрямую в байты pydantic-core.
+
+    Если эндпоинт возвращает pydantic-модель, FastAPI валидирует ее повторно
+    по response_model и кодирует через jsonable_encoder + json.dumps.
+    ModelResponse пропускает оба шага: модель уже провалидирована при
+    создании, готовые байты (например, JSON из PostgreSQL) отдаются как есть.
+    response_model в декораторе остается для документации OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
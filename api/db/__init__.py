@@ -1,5 +1,27 @@
-from .connection import create_engine
-from .session import get_db, async_session_factory
-
-__all__ = ["create_engine", "get_db", "async_session_factory"]
+from .connection import create_engine, MeteredQueuePool, PoolMetrics
+from .routing import ReplicaRouter, STICKY_COOKIE
+from .statements import StatementCounter, count_statements
+from .session import (
+    get_db,
+    get_read_db,
+    get_replica_router,
+    async_session_factory,
+    engine,
+    replica_router,
+)
 
+__all__ = [
+    "create_engine",
+    "MeteredQueuePool",
+    "PoolMetrics",
+    "ReplicaRouter",
+    "STICKY_COOKIE",
+    "StatementCounter",
+    "count_statements",
+    "get_db",
+    "get_read_db",
+    "get_replica_router",
+    "async_session_factory",
+    "engine",
+    "replica_router",
+]
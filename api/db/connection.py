@@ -1,5 +1,145 @@
+import time
+from dataclasses import dataclass
+from typing import Literal
+from uuid import uuid4
+
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+PrePing = Literal["always", "never", "idle"]
+
+
+@dataclass
+class PoolMetrics:
+    """Счетчики выдачи соединений из пула"""
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0  # секунды
+    wait_max: float = 0.0  # секунды
+    pings: int = 0
+    reconnects: int = 0
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.checkouts if self.checkouts else 0.0
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool, измеряющий время ожидания соединения.
+
+    Время считается от запроса соединения до его получения: ожидание
+    свободного соединения в очереди или открытие нового (overflow).
+    Таймаут ожидания (pool_timeout) учитывается отдельно.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        wait = time.perf_counter() - started
+        self.metrics.checkouts += 1
+        self.metrics.wait_total += wait
+        self.metrics.wait_max = max(self.metrics.wait_max, wait)
+        return record
+
+    def recreate(self) -> "MeteredQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _install_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Проверка соединения (ping) при выдаче из пула, только если оно
+    простаивало дольше `idle_seconds`. Свежие соединения выдаются без
+    лишнего обращения к БД; мертвое соединение пул заменяет новым
+    (DisconnectionError из события checkout).
+    """
+    pool = engine.pool
+
+    @event.listens_for(pool, "checkin")
+    def remember_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def ping_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            metrics.pings += 1
+        try:
+            dbapi_connection.ping()
+        except Exception as error:
+            if metrics is not None:
+                metrics.reconnects += 1
+            raise exc.DisconnectionError() from error
+
+
+def create_engine(
+    dsn: str,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+    pre_ping: PrePing = "always",
+    pre_ping_idle: float = 30.0,
+    statement_cache_size: int = 100,
+    pgbouncer: bool = False,
+    statement_timeout: int = 0,
+) -> AsyncEngine:
+    """
+    Создает движок БД с пулом соединений MeteredQueuePool.
 
+    Args:
+        dsn: URL подключения (postgresql+asyncpg://...)
+        pool_size: Постоянных соединений в пуле
+        max_overflow: Дополнительных соединений сверх pool_size
+        pool_timeout: Сколько секунд ждать свободного соединения
+        pool_recycle: Пересоздавать соединения старше N секунд (-1 - никогда)
+        pre_ping: Проверка соединения при выдаче: "always" - всегда,
+            "never" - никогда, "idle" - если простаивало дольше pre_ping_idle
+        pre_ping_idle: Порог простоя для pre_ping="idle", секунды
+        statement_cache_size: Размер кэша подготовленных выражений на соединение
+        pgbouncer: Режим PgBouncer (transaction pooling): кэши подготовленных
+            выражений выключены, имена выражений уникальны
+        statement_timeout: statement_timeout сервера в мс (0 - без ограничения)
+    """
+    connect_args: dict = {
+        "statement_cache_size": statement_cache_size,
+        "prepared_statement_cache_size": statement_cache_size,
+    }
+    if pgbouncer:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    if statement_timeout:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout)}
 
-def create_engine(dsn: str) -> AsyncEngine:
-    return create_async_engine(dsn, echo=False, pool_pre_ping=True)
\ No newline at end of file
+    engine = create_async_engine(
+        dsn,
+        echo=False,
+        poolclass=MeteredQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pre_ping == "always",
+        connect_args=connect_args,
+    )
+    if pre_ping == "idle":
+        _install_idle_pre_ping(engine, pre_ping_idle)
+    return engine
@@ -0,0 +1,70 @@
+import itertools
+import math
+import time
+from typing import Literal
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ReplicaStrategy = Literal["round_robin", "least_connections"]
+
+# Cookie с моментом (unix time), до которого чтения клиента идут в primary
+STICKY_COOKIE = "db_primary_until"
+
+
+class ReplicaRouter:
+    """
+    Выбор движка БД для чтения: primary или одна из реплик.
+
+    Чтения распределяются по репликам по кругу (round_robin) или на реплику
+    с наименьшим числом выданных соединений (least_connections). Без реплик
+    все запросы идут в primary.
+
+    Чтобы клиент видел собственные изменения несмотря на отставание реплик,
+    после записи ему выставляется cookie STICKY_COOKIE: в течение
+    `sticky_seconds` его чтения обслуживает primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        strategy: ReplicaStrategy = "round_robin",
+        sticky_seconds: float = 5.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self._round_robin = itertools.cycle(replicas)
+
+    def read_engine(self, request: Request | None = None) -> AsyncEngine:
+        """Движок для чтения с учетом cookie привязки к primary"""
+        if not self.replicas or (request is not None and self.is_sticky(request)):
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(self.replicas, key=lambda engine: engine.pool.checkedout())
+        return next(self._round_robin)
+
+    def is_sticky(self, request: Request) -> bool:
+        """Клиент недавно писал в БД и должен читать из primary"""
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def stick_to_primary(self, response: Response) -> None:
+        """Привязывает чтения клиента к primary после записи"""
+        if not self.replicas or self.sticky_seconds <= 0:
+            return
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + self.sticky_seconds:.3f}",
+            max_age=math.ceil(self.sticky_seconds),
+            httponly=True,
+        )
+
+    async def dispose(self) -> None:
+        """Закрывает соединения реплик"""
+        for engine in self.replicas:
+            await engine.dispose()
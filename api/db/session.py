@@ -1,10 +1,39 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from functools import cache
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from typing import AsyncGenerator
 from .connection import create_engine
+from .routing import ReplicaRouter
 from api.core.config import settings
 
+
+def _create_engine(dsn: str) -> AsyncEngine:
+    """Движок с настройками пула из Settings"""
+    return create_engine(
+        dsn,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pre_ping=settings.DB_PRE_PING,
+        pre_ping_idle=settings.DB_PRE_PING_IDLE,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        pgbouncer=settings.DB_PGBOUNCER,
+        statement_timeout=settings.DB_STATEMENT_TIMEOUT,
+    )
+
+
 # Создаем движок базы данных
-engine = create_engine(settings.database_url)
+engine = _create_engine(settings.database_url)
+
+# Маршрутизация чтений по репликам
+replica_router = ReplicaRouter(
+    engine,
+    [_create_engine(dsn) for dsn in settings.DB_REPLICA_URLS],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    sticky_seconds=settings.DB_STICKY_PRIMARY_SECONDS,
+)
 
 # Создаем фабрику сессий
 async_session_factory = async_sessionmaker(
@@ -28,3 +57,30 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+
+@cache
+def _autocommit(engine: AsyncEngine) -> AsyncEngine:
+    """Копия движка (с тем же пулом), работающая без транзакций"""
+    return engine.execution_options(isolation_level="AUTOCOMMIT")
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Dependency для получения маршрутизатора чтений"""
+    return replica_router
+
+
+async def get_read_db(
+    request: Request,
+    router: ReplicaRouter = Depends(get_replica_router),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency для получения сессии БД только для чтения.
+
+    Сессия привязана к реплике (или к primary, если реплик нет либо клиент
+    недавно писал в БД - см. ReplicaRouter) и работает в AUTOCOMMIT: чтения
+    не открывают транзакцию, BEGIN и COMMIT/ROLLBACK не отправляются.
+    Каждый запрос видит свой снимок данных, поэтому эндпоинту лучше читать
+    одним запросом.
+    """
+    async with async_session_factory(bind=_autocommit(router.read_engine(request))) as session:
+        yield session
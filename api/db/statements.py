@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class StatementCounter:
+    """Число обращений к БД: SQL-запросы и управление транзакциями"""
+    statements: int = 0  # запросы, включая SAVEPOINT
+    begins: int = 0
+    commits: int = 0
+    rollbacks: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.statements + self.begins + self.commits + self.rollbacks
+
+
+# Активные счетчики (вложенные: запрос внутри теста и т.п.)
+_counters: ContextVar[tuple[StatementCounter, ...]] = ContextVar("sql_counters", default=())
+
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    """
+    Считает обращения к БД, выполненные в текущем контексте (задаче asyncio).
+
+    Счетчики вложенные: внешний видит и то, что посчитал внутренний.
+    """
+    counter = StatementCounter()
+    token = _counters.set(_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+def _is_autocommit(conn) -> bool:
+    # В AUTOCOMMIT BEGIN/COMMIT/ROLLBACK на сервер не отправляются
+    return conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in _counters.get():
+        counter.statements += 1
+
+
+@event.listens_for(Engine, "begin")
+def _count_begin(conn):
+    if _counters.get() and not _is_autocommit(conn):
+        for counter in _counters.get():
+            counter.begins += 1
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(conn):
+    if _counters.get() and not _is_autocommit(conn):
+        for counter in _counters.get():
+            counter.commits += 1
+
+
+@event.listens_for(Engine, "rollback")
+def _count_rollback(conn):
+    if _counters.get() and not _is_autocommit(conn):
+        for counter in _counters.get():
+            counter.rollbacks += 1
@@ -1,8 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.core.config import settings
-from api.v1 import orders_router
+from api.core.middleware import SQLStatementsMiddleware
+from api.db import engine, replica_router
+from api.services import category_index, order_partitions, sales_rollup, stock_reservations
+from api.v1 import (
+    orders_router,
+    admin_router,
+    categories_router,
+    reports_router,
+    clients_router,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск и остановка фоновых компонентов приложения"""
+    # Индекс дерева категорий: загрузка и подписка на изменения
+    await category_index.reload()
+    await category_index.listen(engine)
+    # Перенос журнала продаж в дневные итоги для отчетов
+    sales_rollup.start()
+    # Месячные секции заказов: создаем на ближайшие месяцы до приема запросов
+    await order_partitions.ensure()
+    order_partitions.start()
+    yield
+    await order_partitions.stop()
+    await category_index.stop()
+    await sales_rollup.stop()
+    # Дообрабатываем очередь резервирования остатков перед остановкой
+    await stock_reservations.stop()
+    await replica_router.dispose()
+
 
 # Создаем приложение FastAPI
 app = FastAPI(
@@ -15,11 +47,14 @@ app = FastAPI(
     - Автоматическое увеличение количества для существующих позиций
     - Контроль остатков на складе
     - Иерархия категорий товаров
+    - Отчет о самых продаваемых товарах
+    - Суммы заказов по клиентам
     """,
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Настройка CORS
@@ -31,8 +66,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Число обращений к БД в заголовке X-SQL-Statements
+app.add_middleware(SQLStatementsMiddleware)
+
 # Подключаем роутеры
 app.include_router(orders_router, prefix=settings.API_V1_PREFIX)
+app.include_router(admin_router, prefix=settings.API_V1_PREFIX)
+app.include_router(categories_router, prefix=settings.API_V1_PREFIX)
+app.include_router(reports_router, prefix=settings.API_V1_PREFIX)
+app.include_router(clients_router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/", tags=["health"])
@@ -1,13 +1,18 @@
 from .base import Base
-from .products import Category, Product
-from .orders import Client, Order, OrderItem
+from .products import Category, Product, ProductStockShard
+from .orders import Client, ClientTotals, Order, OrderItem
+from .sales import ProductSalesDaily, ProductSalesPending
 
 __all__ = [
     "Base",
     "Category",
     "Product",
+    "ProductStockShard",
     "Client",
+    "ClientTotals",
     "Order",
     "OrderItem",
+    "ProductSalesDaily",
+    "ProductSalesPending",
 ]
 
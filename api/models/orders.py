@@ -1,4 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Numeric, Text, DateTime
+import re
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    String,
+    ForeignKey,
+    ForeignKeyConstraint,
+    UniqueConstraint,
+    Numeric,
+    Text,
+    DateTime,
+    event,
+    text,
+)
 from sqlalchemy.orm import relationship, backref
 from .base import Base
 from datetime import datetime
@@ -12,25 +29,250 @@ class Client(Base):
     
     orders = relationship('Order', back_populates='client', cascade="all, delete-orphan")
 
+class ClientTotals(Base):
+    """
+    Итоги клиента по всем его заказам.
+
+    Поддерживаются триггерами в той же транзакции, что и изменение заказов,
+    поэтому сумма по клиенту читается одной строкой вместо join
+    clients/orders/order_items. Расхождения ищет ClientTotalsReconciler.
+    """
+    __tablename__ = 'client_totals'
+
+    client_id = Column(Integer, ForeignKey('clients.id', ondelete='CASCADE'), primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(BigInteger, nullable=False, default=0)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Список клиентов по убыванию суммы - обратный проход по индексу
+        Index('ix_client_totals_total_amount', 'total_amount', 'client_id'),
+    )
+
 class Order(Base):
+    """
+    Заказ.
+
+    Таблица секционирована по месяцам created_at (RANGE), позиции заказа
+    лежат в секциях order_items того же месяца (order_items.order_created_at).
+    Ключ секционирования входит в первичный ключ, поэтому id уникален
+    за счет последовательности, а не ограничения. Секции на будущие месяцы
+    создает и старые архивирует OrderPartitionManager, строки вне
+    созданных секций попадают в секцию DEFAULT.
+    """
     __tablename__ = 'orders'
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     client_id = Column(Integer, ForeignKey('clients.id'), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        default=datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+        index=True,
+    )
+    # Итоги по позициям заказа, поддерживаются триггером на order_items
+    total_quantity = Column(Integer, nullable=False, server_default=text('0'))
+    total_amount = Column(Numeric(14, 2), nullable=False, server_default=text('0'))
 
     client = relationship('Client', back_populates='orders')
-    items = relationship('OrderItem', back_populates='order', cascade="all, delete-orphan")
+    items = relationship(
+        'OrderItem',
+        back_populates='order',
+        cascade="all, delete-orphan",
+        order_by='OrderItem.id',
+    )
 
 class OrderItem(Base):
     __tablename__ = 'order_items'
 
-    id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    # Дата заказа - ключ секционирования, позиции лежат в секции месяца заказа
+    order_created_at = Column(DateTime, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
 
     order = relationship('Order', back_populates='items')
     # Здесь SQLAlchemy связывает 'Product' с моделью из файла products.py
-    product = relationship('Product')
\ No newline at end of file
+    product = relationship('Product')
+
+    __table_args__ = (
+        ForeignKeyConstraint(['order_id', 'order_created_at'], ['orders.id', 'orders.created_at']),
+        # Один товар - одна позиция в заказе (нужно для INSERT ... ON CONFLICT).
+        # order_created_at определяется заказом, но обязан входить в уникальный
+        # ключ секционированной таблицы
+        UniqueConstraint(
+            'order_id', 'product_id', 'order_created_at', name='uq_order_items_order_product'
+        ),
+        {'postgresql_partition_by': 'RANGE (order_created_at)'},
+    )
+
+
+# Имена секций orders и order_items: DEFAULT и месячные (orders_p2025_01).
+# Секции не описаны в метаданных, env.py исключает их из autogenerate
+PARTITION_NAME_RE = re.compile(r'^(orders|order_items)_(default|p(\d{4})_(\d{2}))$')
+
+# Секции DEFAULT для строк вне созданных месячных секций. Месячные секции
+# создает OrderPartitionManager (api/services/partitions.py)
+PARTITION_DEFAULT_DDL = {
+    Order.__table__: "CREATE TABLE orders_default PARTITION OF orders DEFAULT",
+    OrderItem.__table__: "CREATE TABLE order_items_default PARTITION OF order_items DEFAULT",
+}
+
+for table, statement in PARTITION_DEFAULT_DDL.items():
+    event.listen(table, "after_create", DDL(statement))
+
+
+# Итоги заказов и клиентов. Триггеры уровня выражения: изменения позиций
+# суммируются по заказам, изменения заказов - по клиентам. Строки блокируются
+# в порядке id, чтобы параллельные пакетные вставки не приводили к deadlock.
+# Копия - в миграции 9c2e5a7b1d48
+ORDER_TOTALS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION order_items_order_totals() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM 1 FROM orders
+            WHERE (id, created_at) IN (SELECT order_id, order_created_at FROM new_items)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity + d.quantity,
+                total_amount = o.total_amount + d.amount
+            FROM (
+                SELECT order_id, order_created_at,
+                       SUM(quantity) AS quantity, SUM(quantity * price) AS amount
+                FROM new_items
+                GROUP BY order_id, order_created_at
+            ) d
+            WHERE o.id = d.order_id AND o.created_at = d.order_created_at;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM 1 FROM orders
+            WHERE (id, created_at) IN (SELECT order_id, order_created_at FROM old_items)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity - d.quantity,
+                total_amount = o.total_amount - d.amount
+            FROM (
+                SELECT order_id, order_created_at,
+                       SUM(quantity) AS quantity, SUM(quantity * price) AS amount
+                FROM old_items
+                GROUP BY order_id, order_created_at
+            ) d
+            WHERE o.id = d.order_id AND o.created_at = d.order_created_at;
+        ELSE
+            PERFORM 1 FROM orders
+            WHERE (id, created_at) IN (
+                SELECT order_id, order_created_at FROM new_items
+                UNION
+                SELECT order_id, order_created_at FROM old_items
+            )
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE orders o
+            SET total_quantity = o.total_quantity + d.quantity,
+                total_amount = o.total_amount + d.amount
+            FROM (
+                SELECT order_id, order_created_at, SUM(quantity) AS quantity, SUM(amount) AS amount
+                FROM (
+                    SELECT order_id, order_created_at, quantity, quantity * price AS amount
+                    FROM new_items
+                    UNION ALL
+                    SELECT order_id, order_created_at, -quantity, -quantity * price
+                    FROM old_items
+                ) changes
+                GROUP BY order_id, order_created_at
+                HAVING SUM(quantity) <> 0 OR SUM(amount) <> 0
+            ) d
+            WHERE o.id = d.order_id AND o.created_at = d.order_created_at;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION orders_client_totals() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, COUNT(*), SUM(total_quantity), SUM(total_amount)
+            FROM new_orders
+            GROUP BY client_id
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, -COUNT(*), -SUM(total_quantity), -SUM(total_amount)
+            FROM old_orders
+            GROUP BY client_id
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        ELSE
+            INSERT INTO client_totals AS t (client_id, orders_count, total_quantity, total_amount)
+            SELECT client_id, SUM(orders_count), SUM(total_quantity), SUM(total_amount)
+            FROM (
+                SELECT client_id, 1 AS orders_count, total_quantity, total_amount FROM new_orders
+                UNION ALL
+                SELECT client_id, -1, -total_quantity, -total_amount FROM old_orders
+            ) changes
+            GROUP BY client_id
+            HAVING SUM(orders_count) <> 0 OR SUM(total_quantity) <> 0 OR SUM(total_amount) <> 0
+            ORDER BY client_id
+            ON CONFLICT (client_id) DO UPDATE
+            SET orders_count = t.orders_count + EXCLUDED.orders_count,
+                total_quantity = t.total_quantity + EXCLUDED.total_quantity,
+                total_amount = t.total_amount + EXCLUDED.total_amount;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_insert
+    AFTER INSERT ON order_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_update
+    AFTER UPDATE ON order_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_totals_delete
+    AFTER DELETE ON order_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_order_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_insert
+    AFTER INSERT ON orders
+    REFERENCING NEW TABLE AS new_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_update
+    AFTER UPDATE ON orders
+    REFERENCING OLD TABLE AS old_orders NEW TABLE AS new_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER orders_client_totals_delete
+    AFTER DELETE ON orders
+    REFERENCING OLD TABLE AS old_orders
+    FOR EACH STATEMENT EXECUTE FUNCTION orders_client_totals()
+    """,
+]
+
+# Триггеры ссылаются на несколько таблиц - создаем их после всех таблиц
+for statement in ORDER_TOTALS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
@@ -1,25 +1,150 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Numeric
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Column,
+    FetchedValue,
+    Index,
+    Integer,
+    String,
+    ForeignKey,
+    UniqueConstraint,
+    Numeric,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.orm import relationship, backref, column_property
 from .base import Base
 
 class Category(Base):
+    """
+    Категория товаров (дерево через parent_id).
+
+    root_category_id, depth и path (материализованный путь вида "/1/5/12/")
+    заполняются триггером categories_tree при вставке и смене parent_id,
+    при переносе категории триггер пересчитывает все ее поддерево. Поэтому
+    корень категории - обычный индексированный столбец, а поддерево -
+    префиксный поиск `path LIKE '/1/5/%'`.
+    """
     __tablename__ = 'categories'
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False, index=True)
     parent_id = Column(Integer, ForeignKey('categories.id'), index=True)
+    root_category_id = Column(
+        Integer,
+        ForeignKey('categories.id'),
+        nullable=False,
+        index=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
+    depth = Column(
+        Integer, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
+    path = Column(
+        String, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
     products = relationship('Product', back_populates='category')
     
     children = relationship(
         'Category',
         backref=backref('parent', remote_side=[id]),
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        foreign_keys=[parent_id],
     )
+    root = relationship('Category', remote_side=[id], foreign_keys=[root_category_id])
     
     __table_args__ = (
         UniqueConstraint('name', 'parent_id', name='uq_category_parent_name'),
+        Index('ix_categories_path', 'path', postgresql_ops={'path': 'text_pattern_ops'}),
     )
 
+
+# Поддержка root_category_id/depth/path. Копия - в миграции 5d0e8a1f3b2c
+CATEGORY_TREE_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION categories_set_tree() RETURNS trigger AS $$
+    DECLARE
+        parent_root integer;
+        parent_depth integer;
+        parent_path varchar;
+    BEGIN
+        IF NEW.parent_id IS NULL THEN
+            NEW.root_category_id := NEW.id;
+            NEW.depth := 0;
+            NEW.path := '/' || NEW.id || '/';
+            RETURN NEW;
+        END IF;
+
+        SELECT root_category_id, depth, path
+        INTO parent_root, parent_depth, parent_path
+        FROM categories WHERE id = NEW.parent_id;
+        IF NOT FOUND THEN
+            RAISE foreign_key_violation
+                USING MESSAGE = format('parent category %s does not exist', NEW.parent_id);
+        END IF;
+        IF TG_OP = 'UPDATE' AND parent_path LIKE OLD.path || '%' THEN
+            RAISE check_violation
+                USING MESSAGE = format('category %s cannot be moved into its own subtree', NEW.id);
+        END IF;
+
+        NEW.root_category_id := parent_root;
+        NEW.depth := parent_depth + 1;
+        NEW.path := parent_path || NEW.id || '/';
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION categories_move_subtree() RETURNS trigger AS $$
+    BEGIN
+        UPDATE categories
+        SET path = NEW.path || substr(path, length(OLD.path) + 1),
+            depth = depth + NEW.depth - OLD.depth,
+            root_category_id = NEW.root_category_id
+        WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER categories_tree
+    BEFORE INSERT OR UPDATE OF parent_id ON categories
+    FOR EACH ROW EXECUTE FUNCTION categories_set_tree()
+    """,
+    """
+    CREATE TRIGGER categories_tree_move
+    AFTER UPDATE OF parent_id ON categories
+    FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path)
+    EXECUTE FUNCTION categories_move_subtree()
+    """,
+]
+
+# Канал уведомлений об изменении дерева категорий (см. CategoryTreeIndex)
+CATEGORIES_CHANNEL = "categories_changed"
+
+CATEGORY_NOTIFY_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION categories_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CATEGORIES_CHANNEL}', '');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER categories_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION categories_notify()
+    """,
+]
+
+for statement in CATEGORY_TREE_DDL + CATEGORY_NOTIFY_DDL:
+    # DDL форматирует строку через %, знаки % в LIKE экранируем
+    event.listen(Category.__table__, "after_create", DDL(statement.replace("%", "%%")))
+
 class Product(Base):
     __tablename__ = 'products'
 
@@ -29,4 +154,40 @@ class Product(Base):
     price = Column(Numeric(10, 2), nullable=False, index=True)
     category_id = Column(Integer, ForeignKey('categories.id'), index=True)
 
-    category = relationship('Category', back_populates='products')
\ No newline at end of file
+    category = relationship('Category', back_populates='products')
+    stock_shards = relationship(
+        'ProductStockShard', back_populates='product', cascade="all, delete-orphan"
+    )
+
+class ProductStockShard(Base):
+    """
+    Часть остатка товара (шард счетчика).
+
+    Остаток "горячего" товара можно разбить на N строк, чтобы параллельные
+    списания блокировали разные строки. Общий остаток товара равен
+    products.quantity + сумма quantity по его шардам.
+    """
+    __tablename__ = 'product_stock_shards'
+
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    product = relationship('Product', back_populates='stock_shards')
+
+    __table_args__ = (
+        CheckConstraint('quantity >= 0', name='ck_product_stock_shards_quantity'),
+    )
+
+# Общий остаток с учетом шардов (загружается только по запросу: undefer/select)
+Product.total_quantity = column_property(
+    Product.quantity
+    + func.coalesce(
+        select(func.sum(ProductStockShard.quantity))
+        .where(ProductStockShard.product_id == Product.id)
+        .correlate_except(ProductStockShard)
+        .scalar_subquery(),
+        0,
+    ),
+    deferred=True,
+)
\ No newline at end of file
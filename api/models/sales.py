@@ -0,0 +1,114 @@
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Date,
+    Index,
+    Integer,
+    Numeric,
+    event,
+)
+from .base import Base
+
+
+class ProductSalesDaily(Base):
+    """
+    Продажи товара за день (по дате заказа, UTC).
+
+    Строки накапливает SalesRollup из product_sales_pending, поэтому отчет по
+    окну в N дней читает N * (число проданных за день товаров) строк вместо
+    всех позиций заказов за период. Внешнего ключа на products нет: удаление
+    товара не должно ломать перенос журнала, отчет соединяет итоги с products.
+    """
+    __tablename__ = 'product_sales_daily'
+
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    quantity = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Окно по дням читается index-only scan без обращения к таблице
+        Index(
+            'ix_product_sales_daily_day',
+            'day',
+            postgresql_include=['product_id', 'quantity', 'revenue'],
+        ),
+    )
+
+
+class ProductSalesPending(Base):
+    """
+    Журнал изменений продаж, еще не перенесенных в product_sales_daily.
+
+    Заполняется триггером на order_items только вставками (без UPDATE одной
+    строки на товар), поэтому не создает горячих строк при параллельном
+    добавлении одного товара в разные заказы.
+    """
+    __tablename__ = 'product_sales_pending'
+
+    id = Column(BigInteger, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    revenue = Column(Numeric(14, 2), nullable=False)
+
+
+# Запись изменений order_items в журнал продаж. Триггеры уровня выражения:
+# пакетная вставка позиций дает одну строку журнала на товар и день,
+# а не на каждую позицию. Копия - в миграции 9c2e5a7b1d48
+SALES_ROLLUP_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION order_items_sales_delta() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT product_id, order_created_at::date, SUM(quantity), SUM(quantity * price)
+            FROM new_items
+            GROUP BY product_id, order_created_at::date;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT product_id, order_created_at::date, -SUM(quantity), -SUM(quantity * price)
+            FROM old_items
+            GROUP BY product_id, order_created_at::date;
+        ELSE
+            INSERT INTO product_sales_pending (product_id, day, quantity, revenue)
+            SELECT product_id, day, SUM(quantity), SUM(revenue)
+            FROM (
+                SELECT product_id, order_created_at::date AS day, quantity, quantity * price AS revenue
+                FROM new_items
+                UNION ALL
+                SELECT product_id, order_created_at::date, -quantity, -quantity * price
+                FROM old_items
+            ) changes
+            GROUP BY product_id, day
+            HAVING SUM(quantity) <> 0 OR SUM(revenue) <> 0;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_insert
+    AFTER INSERT ON order_items
+    REFERENCING NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_update
+    AFTER UPDATE ON order_items
+    REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER order_items_sales_delete
+    AFTER DELETE ON order_items
+    REFERENCING OLD TABLE AS old_items
+    FOR EACH STATEMENT EXECUTE FUNCTION order_items_sales_delta()
+    """,
+]
+
+# Триггеры ссылаются на order_items и product_sales_pending - создаем их после всех таблиц
+# (metadata after_create срабатывает и при повторном create_all, отсюда OR REPLACE)
+for statement in SALES_ROLLUP_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
@@ -1,16 +1,56 @@
 from .orders import (
     AddItemToOrderRequest,
+    AddItemsRequest,
     OrderItemResponse,
+    AddItemResult,
+    AddItemsResponse,
     ProductResponse,
     OrderResponse,
     ErrorResponse,
 )
+from .cache import CacheStatsResponse
+from .clients import (
+    ClientTotalsResponse,
+    ClientTotalsDrift,
+    OrderTotalsDrift,
+    ReconciliationResponse,
+)
+from .categories import (
+    CategoryCreateRequest,
+    CategoryUpdateRequest,
+    CategoryResponse,
+    CategoryDetailResponse,
+)
+from .db import PoolStatsResponse
+from .reports import TopProductResponse
+from .products import (
+    StockShardsRequest,
+    StockShardResponse,
+    ProductStockResponse,
+)
 
 __all__ = [
     "AddItemToOrderRequest",
+    "AddItemsRequest",
     "OrderItemResponse",
+    "AddItemResult",
+    "AddItemsResponse",
     "ProductResponse",
     "OrderResponse",
     "ErrorResponse",
+    "StockShardsRequest",
+    "StockShardResponse",
+    "ProductStockResponse",
+    "CacheStatsResponse",
+    "CategoryCreateRequest",
+    "CategoryUpdateRequest",
+    "CategoryResponse",
+    "CategoryDetailResponse",
+    "PoolStatsResponse",
+    "TopProductResponse",
+    "ClientTotalsResponse",
+    "ClientTotalsDrift",
+    "OrderTotalsDrift",
+    "ReconciliationResponse",
 ]
 
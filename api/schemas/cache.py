@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    """Статистика кэша"""
+    backend: str
+    size: Optional[int] = None
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    hit_ratio: float
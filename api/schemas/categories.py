@@ -0,0 +1,44 @@
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CategoryCreateRequest(BaseModel):
+    """Запрос на создание категории"""
+    model_config = ConfigDict(json_schema_extra={
+        "example": {"name": "Ноутбуки", "parent_id": 1}
+    })
+    
+    name: str = Field(..., description="Название категории", min_length=1, max_length=255)
+    parent_id: Optional[int] = Field(None, description="ID родительской категории", gt=0)
+
+
+class CategoryUpdateRequest(BaseModel):
+    """
+    Запрос на изменение категории. Переданные поля меняются, `parent_id: null`
+    делает категорию корневой.
+    """
+    model_config = ConfigDict(json_schema_extra={
+        "example": {"parent_id": 4}
+    })
+    
+    name: Optional[str] = Field(None, description="Новое название", min_length=1, max_length=255)
+    parent_id: Optional[int] = Field(None, description="Новый родитель", gt=0)
+
+
+class CategoryResponse(BaseModel):
+    """Категория"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    root_category_id: int
+    depth: int
+
+
+class CategoryDetailResponse(CategoryResponse):
+    """Категория с путем от корня и прямыми потомками"""
+    ancestors: list[CategoryResponse] = Field(..., description="Путь от корня до родителя")
+    children: list[CategoryResponse]
+    subtree_size: int = Field(..., description="Число категорий в поддереве, включая эту")
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ClientTotalsResponse(BaseModel):
+    """Итоги клиента по всем заказам"""
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "client_id": 1,
+                "client_name": "ООО Ромашка",
+                "orders_count": 3,
+                "total_quantity": 12,
+                "total_amount": "15999.88"
+            }
+        }
+    )
+
+    client_id: int
+    client_name: str
+    orders_count: int
+    total_quantity: int
+    total_amount: Decimal
+
+
+class ClientTotalsDrift(BaseModel):
+    """Расхождение сохраненных итогов клиента с пересчитанными"""
+    model_config = ConfigDict(from_attributes=True)
+
+    client_id: int
+    orders_count: int
+    total_quantity: int
+    total_amount: Decimal
+    expected_orders_count: int
+    expected_total_quantity: int
+    expected_total_amount: Decimal
+
+
+class OrderTotalsDrift(BaseModel):
+    """Расхождение сохраненных итогов заказа с суммой по позициям"""
+    model_config = ConfigDict(from_attributes=True)
+
+    order_id: int
+    total_quantity: int
+    total_amount: Decimal
+    expected_total_quantity: int
+    expected_total_amount: Decimal
+
+
+class ReconciliationResponse(BaseModel):
+    """Результат сверки итогов клиентов и заказов"""
+    chunks: int = Field(..., description="Проверено диапазонов client_id")
+    fixed: bool = Field(..., description="Исправлены ли найденные расхождения")
+    clients: list[ClientTotalsDrift] = Field(..., description="Расхождения итогов клиентов")
+    orders: list[OrderTotalsDrift] = Field(..., description="Расхождения итогов заказов")
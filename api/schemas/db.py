@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class PoolStatsResponse(BaseModel):
+    """Состояние пула соединений с БД"""
+    size: int = Field(..., description="Постоянных соединений (pool_size)")
+    checked_in: int = Field(..., description="Свободных соединений в пуле")
+    checked_out: int = Field(..., description="Выданных соединений")
+    overflow: int = Field(..., description="Соединений сверх pool_size")
+    checkouts: int
+    timeouts: int = Field(..., description="Запросов, не дождавшихся соединения")
+    wait_avg_ms: float
+    wait_max_ms: float
+    pings: int = Field(..., description="Проверок соединений после простоя")
+    reconnects: int = Field(..., description="Замененных мертвых соединений")
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 
 class AddItemToOrderRequest(BaseModel):
@@ -19,6 +19,30 @@ class AddItemToOrderRequest(BaseModel):
     quantity: int = Field(..., description="Количество товара", gt=0)
 
 
+class AddItemsRequest(BaseModel):
+    """Пакетное добавление товаров в один или несколько заказов"""
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "items": [
+                {"order_id": 1, "product_id": 5, "quantity": 2},
+                {"order_id": 1, "product_id": 7, "quantity": 1}
+            ],
+            "mode": "all_or_nothing"
+        }
+    })
+    
+    items: list[AddItemToOrderRequest] = Field(
+        ..., description="Позиции для добавления", min_length=1, max_length=1000
+    )
+    mode: Literal["all_or_nothing", "best_effort"] = Field(
+        "all_or_nothing",
+        description=(
+            "all_or_nothing - при ошибке в любой позиции ничего не добавляется; "
+            "best_effort - добавляются все позиции, прошедшие проверки"
+        ),
+    )
+
+
 class OrderItemResponse(BaseModel):
     """Ответ с информацией о позиции заказа"""
     model_config = ConfigDict(
@@ -41,6 +65,20 @@ class OrderItemResponse(BaseModel):
     price: Decimal
 
 
+class AddItemResult(BaseModel):
+    """Результат добавления одной позиции из пакета"""
+    index: int = Field(..., description="Номер позиции в запросе")
+    status_code: int = Field(..., description="HTTP-код, как у /add-item (200, 404, 422, 409)")
+    detail: Optional[str] = None
+    item: Optional[OrderItemResponse] = None
+
+
+class AddItemsResponse(BaseModel):
+    """Ответ на пакетное добавление товаров"""
+    applied: bool = Field(..., description="Были ли изменения сохранены в БД")
+    results: list[AddItemResult]
+
+
 class ProductResponse(BaseModel):
     """Ответ с информацией о товаре"""
     model_config = ConfigDict(from_attributes=True)
@@ -59,6 +97,8 @@ class OrderResponse(BaseModel):
     id: int
     client_id: int
     created_at: datetime
+    total_quantity: int = Field(0, description="Количество единиц товара в заказе")
+    total_amount: Decimal = Field(Decimal("0"), description="Сумма заказа")
     items: list[OrderItemResponse] = []
 
 
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class StockShardsRequest(BaseModel):
+    """Запрос на разбиение остатка товара на шарды"""
+    model_config = ConfigDict(json_schema_extra={"example": {"shards": 8}})
+    
+    shards: int = Field(..., description="Количество шардов", ge=1, le=256)
+
+
+class StockShardResponse(BaseModel):
+    """Остаток в одном шарде"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    shard: int
+    quantity: int
+
+
+class ProductStockResponse(BaseModel):
+    """Остаток товара с разбивкой по шардам"""
+    product_id: int
+    quantity: int = Field(..., description="Общий остаток (products.quantity + шарды)")
+    unsharded_quantity: int = Field(..., description="Остаток вне шардов (products.quantity)")
+    shards: list[StockShardResponse] = []
@@ -0,0 +1,26 @@
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class TopProductResponse(BaseModel):
+    """Товар в отчете о самых продаваемых товарах"""
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "product_id": 5,
+                "product_name": "Ноутбук",
+                "root_category_name": "Электроника",
+                "quantity": 42,
+                "revenue": "54599.58"
+            }
+        }
+    )
+
+    product_id: int
+    product_name: str
+    root_category_name: Optional[str] = None
+    quantity: int
+    revenue: Decimal
@@ -0,0 +1,95 @@
+from .orders import (
+    OrderNotFoundError,
+    ProductNotFoundError,
+    InsufficientStockError,
+    add_item_atomic,
+    add_items_bulk,
+    load_order_json,
+    load_order_orm,
+)
+from .stock_shards import (
+    add_item_sharded,
+    get_product_stock,
+    merge_stock,
+    split_stock,
+    take_stock,
+)
+from .category_tree import (
+    CategoryNode,
+    CategoryTree,
+    CategoryTreeIndex,
+    category_index,
+    get_category_index,
+)
+from .categories import (
+    CategoryNotFoundError,
+    CategoryConflictError,
+    create_category,
+    get_category_detail,
+    list_subtree_products,
+    update_category,
+)
+from .reservations import (
+    StockReservationEngine,
+    add_item_coalesced,
+    get_stock_reservations,
+    stock_reservations,
+)
+from .sales import (
+    SalesRollup,
+    get_top_products,
+    sales_rollup,
+)
+from .clients import (
+    ClientNotFoundError,
+    ClientTotalsReconciler,
+    client_totals_reconciler,
+    get_client_totals,
+    get_client_totals_reconciler,
+    list_client_totals,
+)
+from .partitions import (
+    OrderPartitionManager,
+    order_partitions,
+)
+
+__all__ = [
+    "OrderNotFoundError",
+    "ProductNotFoundError",
+    "InsufficientStockError",
+    "add_item_atomic",
+    "add_items_bulk",
+    "load_order_json",
+    "load_order_orm",
+    "add_item_sharded",
+    "get_product_stock",
+    "merge_stock",
+    "split_stock",
+    "take_stock",
+    "CategoryNode",
+    "CategoryTree",
+    "CategoryTreeIndex",
+    "category_index",
+    "get_category_index",
+    "CategoryNotFoundError",
+    "CategoryConflictError",
+    "create_category",
+    "get_category_detail",
+    "list_subtree_products",
+    "update_category",
+    "StockReservationEngine",
+    "add_item_coalesced",
+    "get_stock_reservations",
+    "stock_reservations",
+    "SalesRollup",
+    "get_top_products",
+    "sales_rollup",
+    "ClientNotFoundError",
+    "ClientTotalsReconciler",
+    "client_totals_reconciler",
+    "get_client_totals",
+    "get_client_totals_reconciler",
+    "list_client_totals",
+    "OrderPartitionManager",
+    "order_partitions",
+]
@@ -0,0 +1,163 @@
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, any_, bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models import Category, Product
+from api.schemas import (
+    CategoryCreateRequest,
+    CategoryUpdateRequest,
+    CategoryDetailResponse,
+    CategoryResponse,
+    ProductResponse,
+)
+from .category_tree import CategoryTree, CategoryTreeIndex
+
+
+class CategoryNotFoundError(HTTPException):
+    """Категория не найдена"""
+
+    def __init__(self, category_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Категория с ID {category_id} не найдена",
+        )
+
+
+class CategoryConflictError(HTTPException):
+    """Изменение категории нарушает структуру дерева"""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def get_category_detail(tree: CategoryTree, category_id: int) -> CategoryDetailResponse:
+    """
+    Категория с путем от корня и прямыми потомками из индекса дерева.
+
+    Raises:
+        CategoryNotFoundError: Если категория не найдена
+    """
+    if category_id not in tree:
+        raise CategoryNotFoundError(category_id)
+    return CategoryDetailResponse(
+        **vars(tree.node(category_id)),
+        ancestors=[CategoryResponse(**vars(node)) for node in tree.ancestors(category_id)],
+        children=[CategoryResponse(**vars(node)) for node in tree.children(category_id)],
+        subtree_size=len(tree.subtree_ids(category_id)),
+    )
+
+
+async def list_subtree_products(
+    db: AsyncSession,
+    tree: CategoryTree,
+    category_id: int,
+    limit: int,
+    offset: int = 0,
+) -> list[ProductResponse]:
+    """
+    Товары категории и всех ее потомков: один запрос
+    `category_id = ANY(:ids)` по id поддерева из индекса.
+
+    Raises:
+        CategoryNotFoundError: Если категория не найдена
+    """
+    if category_id not in tree:
+        raise CategoryNotFoundError(category_id)
+
+    category_ids = bindparam(
+        "category_ids", list(tree.subtree_ids(category_id)), type_=ARRAY(Integer)
+    )
+    rows = await db.execute(
+        select(Product.id, Product.name, Product.quantity, Product.price, Product.category_id)
+        .where(Product.category_id == any_(category_ids))
+        .order_by(Product.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return [ProductResponse.model_validate(row) for row in rows]
+
+
+async def create_category(
+    db: AsyncSession,
+    index: CategoryTreeIndex,
+    request: CategoryCreateRequest,
+) -> CategoryResponse:
+    """
+    Создает категорию. root_category_id/depth/path заполняет триггер.
+
+    Raises:
+        CategoryNotFoundError: Если родительская категория не найдена
+        CategoryConflictError: Если у родителя уже есть категория с таким названием
+    """
+    statement = insert(Category).values(name=request.name, parent_id=request.parent_id)
+    category = await _write_category(db, statement, request.parent_id)
+    await index.reload()
+    return category
+
+
+async def update_category(
+    db: AsyncSession,
+    index: CategoryTreeIndex,
+    category_id: int,
+    request: CategoryUpdateRequest,
+) -> CategoryResponse:
+    """
+    Переименовывает категорию и/или переносит ее вместе с поддеревом.
+
+    Raises:
+        CategoryNotFoundError: Если категория или новый родитель не найдены
+        CategoryConflictError: Если категория переносится в свое поддерево
+            или у родителя уже есть категория с таким названием
+    """
+    values = request.model_dump(include=request.model_fields_set)
+    if "name" in values and values["name"] is None:
+        del values["name"]
+    statement = update(Category).where(Category.id == category_id)
+    if values:
+        statement = statement.values(**values)
+    else:
+        # Нечего менять - просто возвращаем категорию
+        statement = statement.values(name=Category.name)
+
+    category = await _write_category(db, statement, values.get("parent_id"))
+    if category is None:
+        raise CategoryNotFoundError(category_id)
+    await index.reload()
+    return category
+
+
+async def _write_category(db: AsyncSession, statement, parent_id: int | None):
+    """Выполняет INSERT/UPDATE категории с RETURNING и переводит ошибки триггера"""
+    try:
+        row = (
+            await db.execute(
+                statement.returning(
+                    Category.id,
+                    Category.name,
+                    Category.parent_id,
+                    Category.root_category_id,
+                    Category.depth,
+                )
+            )
+        ).one_or_none()
+    except IntegrityError as error:
+        await db.rollback()
+        sqlstate = getattr(error.orig, "sqlstate", None)
+        if sqlstate == "23503":  # foreign_key_violation
+            raise CategoryNotFoundError(parent_id) from error
+        if sqlstate == "23505":  # unique_violation
+            raise CategoryConflictError(
+                "Категория с таким названием у этого родителя уже существует"
+            ) from error
+        if sqlstate == "23514":  # check_violation - перенос в свое поддерево
+            raise CategoryConflictError(
+                "Категорию нельзя перенести в ее собственное поддерево"
+            ) from error
+        raise
+
+    if row is None:
+        return None
+    await db.commit()
+    return CategoryResponse.model_validate(row)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from array import array
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+from api.db import async_session_factory
+from api.models import Category
+from api.models.products import CATEGORIES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    """Категория в индексе дерева"""
+    id: int
+    name: str
+    parent_id: int | None
+    root_category_id: int
+    depth: int
+
+
+class CategoryTree:
+    """
+    Неизменяемый снимок дерева категорий на массивах.
+
+    Узлы пронумерованы в порядке обхода в глубину (Euler tour, pre-order),
+    поэтому поддерево узла i - непрерывный диапазон [i, end[i]):
+    - проверка "a - предок b" и поиск корня - O(1)
+    - id всех категорий поддерева - срез массива (для `category_id = ANY(...)`)
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Строки (id, parent_id, name). Категории с несуществующим
+                родителем считаются корнями.
+        """
+        rows = sorted(rows, key=lambda row: (row[2], row[0]))
+        names = {row[0]: row[2] for row in rows}
+        children: dict[int | None, list[int]] = {}
+        for category_id, parent_id, _ in rows:
+            if parent_id not in names:
+                parent_id = None
+            children.setdefault(parent_id, []).append(category_id)
+
+        self.ids = array("i")
+        self._parent = array("i")  # позиция родителя, -1 у корня
+        self._root = array("i")  # позиция корня
+        self._depth = array("i")
+        self._end = array("i")  # конец поддерева (не включительно)
+        self._names: list[str] = []
+        self._position: dict[int, int] = {}
+
+        # Итеративный обход в глубину: (id, позиция родителя, вход/выход)
+        stack = [(root_id, -1, True) for root_id in reversed(children.get(None, []))]
+        while stack:
+            category_id, parent, entering = stack.pop()
+            if not entering:
+                self._end[self._position[category_id]] = len(self.ids)
+                continue
+            position = len(self.ids)
+            self._position[category_id] = position
+            self.ids.append(category_id)
+            self._names.append(names[category_id])
+            self._parent.append(parent)
+            self._root.append(position if parent < 0 else self._root[parent])
+            self._depth.append(0 if parent < 0 else self._depth[parent] + 1)
+            self._end.append(position + 1)
+            stack.append((category_id, parent, False))
+            for child_id in reversed(children.get(category_id, [])):
+                stack.append((child_id, position, True))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, category_id: int) -> bool:
+        return category_id in self._position
+
+    def node(self, category_id: int) -> CategoryNode:
+        """Категория по id (KeyError, если ее нет)"""
+        position = self._position[category_id]
+        return self._node(position)
+
+    def nodes(self) -> list[CategoryNode]:
+        """Все категории в порядке обхода дерева"""
+        return [self._node(position) for position in range(len(self.ids))]
+
+    def root_id(self, category_id: int) -> int:
+        """id корневой категории, O(1)"""
+        return self.ids[self._root[self._position[category_id]]]
+
+    def is_ancestor(self, ancestor_id: int, category_id: int) -> bool:
+        """ancestor_id - предок category_id (или она сама), O(1)"""
+        ancestor = self._position[ancestor_id]
+        return ancestor <= self._position[category_id] < self._end[ancestor]
+
+    def ancestors(self, category_id: int) -> list[CategoryNode]:
+        """Путь от корня до родителя категории"""
+        path = []
+        position = self._parent[self._position[category_id]]
+        while position >= 0:
+            path.append(self._node(position))
+            position = self._parent[position]
+        return path[::-1]
+
+    def children(self, category_id: int) -> list[CategoryNode]:
+        """Прямые потомки категории"""
+        position = self._position[category_id]
+        result = []
+        child = position + 1
+        while child < self._end[position]:
+            result.append(self._node(child))
+            child = self._end[child]
+        return result
+
+    def subtree_ids(self, category_id: int) -> array:
+        """id категории и всех ее потомков"""
+        position = self._position[category_id]
+        return self.ids[position:self._end[position]]
+
+    def _node(self, position: int) -> CategoryNode:
+        parent = self._parent[position]
+        return CategoryNode(
+            id=self.ids[position],
+            name=self._names[position],
+            parent_id=self.ids[parent] if parent >= 0 else None,
+            root_category_id=self.ids[self._root[position]],
+            depth=self._depth[position],
+        )
+
+
+class CategoryTreeIndex:
+    """
+    Индекс дерева категорий в памяти процесса.
+
+    Загружается один раз и перестраивается целиком по уведомлению PostgreSQL
+    (LISTEN на канал CATEGORIES_CHANNEL, NOTIFY отправляет триггер на
+    categories). Уведомления, пришедшие во время перестройки, объединяются в
+    одну следующую перестройку. Читатели получают готовый снимок
+    (CategoryTree), который заменяется атомарно.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self._tree: CategoryTree | None = None
+        self._lock = asyncio.Lock()
+        self._version = 0  # число полученных уведомлений
+        self._loaded_version = 0  # версия, с которой загружен снимок
+        self._listener: AsyncConnection | None = None
+        self._reload_task: asyncio.Task | None = None
+
+    async def get(self) -> CategoryTree:
+        """Текущий снимок дерева (загружается при первом обращении)"""
+        if self._tree is None:
+            await self.reload()
+        return self._tree
+
+    async def reload(self) -> CategoryTree:
+        """Перечитывает дерево из БД"""
+        async with self._lock:
+            version = self._version
+            async with self.session_factory() as session:
+                rows = (
+                    await session.execute(select(Category.id, Category.parent_id, Category.name))
+                ).all()
+            self._tree = CategoryTree(rows)
+            self._loaded_version = version
+            return self._tree
+
+    def invalidate(self) -> None:
+        """Помечает дерево устаревшим и перестраивает его в фоне"""
+        self._version += 1
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload_pending())
+
+    async def listen(self, engine: AsyncEngine) -> None:
+        """Подписывается на уведомления об изменении категорий"""
+        self._listener = await engine.connect()
+        raw = await self._listener.get_raw_connection()
+        await raw.driver_connection.add_listener(CATEGORIES_CHANNEL, self._on_notify)
+
+    async def stop(self) -> None:
+        """Отписывается от уведомлений"""
+        if self._listener is not None:
+            raw = await self._listener.get_raw_connection()
+            await raw.driver_connection.remove_listener(CATEGORIES_CHANNEL, self._on_notify)
+            await self._listener.close()
+            self._listener = None
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            self._reload_task = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.invalidate()
+
+    async def _reload_pending(self) -> None:
+        while self._loaded_version < self._version:
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Failed to reload category tree")
+                await asyncio.sleep(1)
+
+
+category_index = CategoryTreeIndex(async_session_factory)
+
+
+def get_category_index() -> CategoryTreeIndex:
+    """Dependency для получения индекса дерева категорий"""
+    return category_index
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+
+from fastapi import HTTPException, status
+from sqlalchemy import Numeric, and_, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.db import async_session_factory
+from api.models import Client, ClientTotals, Order, OrderItem
+from api.schemas import (
+    ClientTotalsDrift,
+    ClientTotalsResponse,
+    OrderTotalsDrift,
+    ReconciliationResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ClientNotFoundError(HTTPException):
+    """Клиент не найден"""
+
+    def __init__(self, client_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Клиент с ID {client_id} не найден",
+        )
+
+
+def _totals_columns():
+    """Итоги клиента (нули, если у клиента еще не было заказов)"""
+    return (
+        Client.id.label("client_id"),
+        Client.name.label("client_name"),
+        func.coalesce(ClientTotals.orders_count, 0).label("orders_count"),
+        func.coalesce(ClientTotals.total_quantity, 0).label("total_quantity"),
+        func.coalesce(ClientTotals.total_amount, cast(0, Numeric(14, 2))).label("total_amount"),
+    )
+
+
+async def get_client_totals(db: AsyncSession, client_id: int) -> ClientTotalsResponse:
+    """
+    Итоги клиента из client_totals - одна строка по первичному ключу.
+
+    Raises:
+        ClientNotFoundError: Если клиент не найден
+    """
+    row = (
+        await db.execute(
+            select(*_totals_columns())
+            .outerjoin(ClientTotals, ClientTotals.client_id == Client.id)
+            .where(Client.id == client_id)
+        )
+    ).one_or_none()
+    if row is None:
+        raise ClientNotFoundError(client_id)
+    return ClientTotalsResponse.model_validate(row)
+
+
+async def list_client_totals(
+    db: AsyncSession,
+    limit: int,
+    offset: int = 0,
+) -> list[ClientTotalsResponse]:
+    """Клиенты с заказами по убыванию суммы заказанных товаров"""
+    rows = await db.execute(
+        select(*_totals_columns())
+        .join(ClientTotals, ClientTotals.client_id == Client.id)
+        .order_by(ClientTotals.total_amount.desc(), ClientTotals.client_id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return [ClientTotalsResponse.model_validate(row) for row in rows]
+
+
+class ClientTotalsReconciler:
+    """
+    Сверка итогов заказов (orders.total_*) и клиентов (client_totals)
+    с пересчетом по order_items.
+
+    Диапазон client_id делится на части по `chunk_size` клиентов, до
+    `concurrency` частей проверяются параллельно в отдельных соединениях.
+    Каждая часть проверяется в транзакции REPEATABLE READ: итоги и позиции
+    читаются из одного снимка, поэтому параллельное добавление товаров не
+    дает ложных расхождений. С `fix=True` расхождения исправляются в той же
+    транзакции (при конфликте с параллельной записью часть проверяется заново).
+    """
+
+    max_attempts = 3
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        chunk_size: int,
+        concurrency: int,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+
+    async def run(self, fix: bool = False) -> ReconciliationResponse:
+        """Проверяет (и при fix=True исправляет) итоги всех клиентов"""
+        async with self.session_factory() as session:
+            low, high = (await session.execute(select(func.min(Client.id), func.max(Client.id)))).one()
+        chunks = (
+            [(start, start + self.chunk_size) for start in range(low, high + 1, self.chunk_size)]
+            if low is not None
+            else []
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def reconcile(bounds: tuple[int, int]):
+            async with semaphore:
+                return await self._reconcile_chunk(*bounds, fix)
+
+        report = ReconciliationResponse(chunks=len(chunks), fixed=fix, clients=[], orders=[])
+        for clients, orders in await asyncio.gather(*(reconcile(bounds) for bounds in chunks)):
+            report.clients.extend(clients)
+            report.orders.extend(orders)
+        if report.clients or report.orders:
+            logger.warning(
+                "Totals drift: %d clients, %d orders (fixed: %s)",
+                len(report.clients), len(report.orders), fix,
+            )
+        return report
+
+    async def _reconcile_chunk(
+        self, low: int, high: int, fix: bool
+    ) -> tuple[list[ClientTotalsDrift], list[OrderTotalsDrift]]:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self.session_factory() as session:
+                    await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                    orders_drift, clients_drift = _drift_queries(low, high)
+                    orders = [
+                        OrderTotalsDrift.model_validate(row)
+                        for row in await session.execute(orders_drift.order_by("order_id"))
+                    ]
+                    clients = [
+                        ClientTotalsDrift.model_validate(row)
+                        for row in await session.execute(clients_drift.order_by("client_id"))
+                    ]
+                    if fix and (orders or clients):
+                        await _fix_chunk(session, low, high)
+                    await session.commit()
+                    return clients, orders
+            except DBAPIError as error:
+                # serialization_failure: итоги изменились после начала снимка
+                if getattr(error.orig, "sqlstate", None) != "40001" or attempt == self.max_attempts:
+                    raise
+
+
+def _drift_queries(low: int, high: int):
+    """Запросы расхождений итогов заказов и клиентов с client_id в [low, high)"""
+    expected_orders = (
+        select(
+            Order.id.label("order_id"),
+            Order.created_at,
+            Order.client_id,
+            Order.total_quantity,
+            Order.total_amount,
+            func.coalesce(func.sum(OrderItem.quantity), 0).label("expected_total_quantity"),
+            cast(
+                func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0), Numeric(14, 2)
+            ).label("expected_total_amount"),
+        )
+        .outerjoin(
+            OrderItem,
+            and_(OrderItem.order_id == Order.id, OrderItem.order_created_at == Order.created_at),
+        )
+        .where(Order.client_id >= low, Order.client_id < high)
+        .group_by(Order.id, Order.created_at)
+        .cte("expected_orders")
+    )
+    orders_drift = select(
+        expected_orders.c.order_id,
+        expected_orders.c.created_at,
+        expected_orders.c.total_quantity,
+        expected_orders.c.total_amount,
+        expected_orders.c.expected_total_quantity,
+        expected_orders.c.expected_total_amount,
+    ).where(
+        or_(
+            expected_orders.c.total_quantity != expected_orders.c.expected_total_quantity,
+            expected_orders.c.total_amount != expected_orders.c.expected_total_amount,
+        )
+    )
+
+    expected_clients = (
+        select(
+            expected_orders.c.client_id,
+            func.count().label("orders_count"),
+            func.sum(expected_orders.c.expected_total_quantity).label("total_quantity"),
+            func.sum(expected_orders.c.expected_total_amount).label("total_amount"),
+        )
+        .group_by(expected_orders.c.client_id)
+        .subquery("expected_clients")
+    )
+    stored = (
+        func.coalesce(ClientTotals.orders_count, 0),
+        func.coalesce(ClientTotals.total_quantity, 0),
+        func.coalesce(ClientTotals.total_amount, cast(0, Numeric(14, 2))),
+    )
+    expected = (
+        func.coalesce(expected_clients.c.orders_count, 0),
+        func.coalesce(expected_clients.c.total_quantity, 0),
+        func.coalesce(expected_clients.c.total_amount, cast(0, Numeric(14, 2))),
+    )
+    clients_drift = (
+        select(
+            Client.id.label("client_id"),
+            stored[0].label("orders_count"),
+            stored[1].label("total_quantity"),
+            stored[2].label("total_amount"),
+            expected[0].label("expected_orders_count"),
+            expected[1].label("expected_total_quantity"),
+            expected[2].label("expected_total_amount"),
+        )
+        .outerjoin(ClientTotals, ClientTotals.client_id == Client.id)
+        .outerjoin(expected_clients, expected_clients.c.client_id == Client.id)
+        .where(Client.id >= low, Client.id < high)
+        .where(or_(*(left != right for left, right in zip(stored, expected))))
+    )
+    return orders_drift, clients_drift
+
+
+async def _fix_chunk(session: AsyncSession, low: int, high: int) -> None:
+    """Записывает пересчитанные итоги заказов, затем клиентов"""
+    orders_drift, _ = _drift_queries(low, high)
+    drift = orders_drift.subquery("drift")
+    # Триггер на orders переносит изменение итогов заказа в client_totals,
+    # поэтому итоги клиентов пересчитываются уже после исправления заказов
+    await session.execute(
+        update(Order)
+        .where(Order.id == drift.c.order_id, Order.created_at == drift.c.created_at)
+        .values(
+            total_quantity=drift.c.expected_total_quantity,
+            total_amount=drift.c.expected_total_amount,
+        )
+    )
+
+    _, clients_drift = _drift_queries(low, high)
+    drift = clients_drift.subquery("drift")
+    statement = insert(ClientTotals).from_select(
+        ["client_id", "orders_count", "total_quantity", "total_amount"],
+        select(
+            drift.c.client_id,
+            drift.c.expected_orders_count,
+            drift.c.expected_total_quantity,
+            drift.c.expected_total_amount,
+        ),
+    )
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ClientTotals.client_id],
+            set_={
+                "orders_count": statement.excluded.orders_count,
+                "total_quantity": statement.excluded.total_quantity,
+                "total_amount": statement.excluded.total_amount,
+            },
+        )
+    )
+
+
+client_totals_reconciler = ClientTotalsReconciler(
+    async_session_factory,
+    chunk_size=settings.RECONCILE_CHUNK_SIZE,
+    concurrency=settings.RECONCILE_CONCURRENCY,
+)
+
+
+def get_client_totals_reconciler() -> ClientTotalsReconciler:
+    """Dependency для получения сверки итогов клиентов"""
+    return client_totals_reconciler
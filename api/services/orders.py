@@ -0,0 +1,374 @@
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, exists, literal, select, text, true, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from api.core.responses import dump_json
+from api.models import Order, OrderItem, Product
+from api.schemas import (
+    AddItemToOrderRequest,
+    AddItemsRequest,
+    OrderItemResponse,
+    OrderResponse,
+    AddItemResult,
+    AddItemsResponse,
+)
+
+
+class OrderNotFoundError(HTTPException):
+    """Заказ не найден"""
+
+    def __init__(self, order_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Заказ с ID {order_id} не найден",
+        )
+
+
+class ProductNotFoundError(HTTPException):
+    """Товар не найден"""
+
+    def __init__(self, product_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Товар с ID {product_id} не найден",
+        )
+
+
+class InsufficientStockError(HTTPException):
+    """Недостаточно товара на складе"""
+
+    def __init__(self, requested: int, available: int):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                f"Недостаточно товара на складе. "
+                f"Запрошено: {requested}, доступно: {available}"
+            ),
+        )
+
+
+def build_add_item_statement(order_id: int, product_id: int, quantity: int):
+    """
+    Строит единый запрос добавления товара в заказ.
+
+    WITH target_order   - заказ (пусто, если не найден)
+         target_product - товар и остаток на момент запроса
+         reserved       - UPDATE products ... WHERE quantity >= :q RETURNING
+         item           - INSERT INTO order_items ... ON CONFLICT DO UPDATE RETURNING
+    SELECT ... FROM target_order LEFT JOIN target_product LEFT JOIN item
+
+    Условие `quantity >= :q` перепроверяется PostgreSQL на актуальной версии
+    строки после ожидания блокировки, поэтому параллельные запросы не могут
+    продать больше, чем есть на складе.
+
+    Результат:
+    - нет строк - заказ не найден
+    - available IS NULL - товар не найден
+    - id IS NULL - недостаточно товара на складе
+    """
+    target_order = (
+        select(Order.id, Order.created_at).where(Order.id == order_id).cte("target_order")
+    )
+    target_product = (
+        select(Product.id, Product.quantity)
+        .where(Product.id == product_id)
+        .cte("target_product")
+    )
+
+    reserved = (
+        update(Product)
+        .where(
+            Product.id == product_id,
+            Product.quantity >= quantity,
+            exists(target_order.select()),
+        )
+        .values(quantity=Product.quantity - quantity)
+        .returning(Product.id, Product.price)
+        .cte("reserved")
+    )
+
+    upsert = insert(OrderItem).from_select(
+        ["order_id", "order_created_at", "product_id", "quantity", "price"],
+        select(
+            target_order.c.id,
+            target_order.c.created_at,
+            reserved.c.id,
+            literal(quantity),
+            reserved.c.price,
+        ).select_from(target_order.join(reserved, true())),
+    )
+    item = (
+        upsert.on_conflict_do_update(
+            constraint="uq_order_items_order_product",
+            set_={"quantity": OrderItem.quantity + upsert.excluded.quantity},
+        )
+        .returning(
+            OrderItem.id,
+            OrderItem.order_id,
+            OrderItem.product_id,
+            OrderItem.quantity,
+            OrderItem.price,
+        )
+        .cte("item")
+    )
+
+    return select(
+        target_product.c.quantity.label("available"),
+        item.c.id,
+        item.c.order_id,
+        item.c.product_id,
+        item.c.quantity,
+        item.c.price,
+    ).select_from(
+        target_order.outerjoin(target_product, true()).outerjoin(item, true())
+    )
+
+
+def build_upsert_items_statement(rows: list[dict]):
+    """
+    INSERT позиций заказа с увеличением количества для уже существующих
+    (ON CONFLICT по uq_order_items_order_product) и RETURNING итоговых строк.
+    Пары (order_id, product_id) в `rows` должны быть уникальны, в каждой
+    строке нужна дата заказа (order_created_at) - ключ секционирования.
+    """
+    upsert = insert(OrderItem).values(rows)
+    return upsert.on_conflict_do_update(
+        constraint="uq_order_items_order_product",
+        set_={"quantity": OrderItem.quantity + upsert.excluded.quantity},
+    ).returning(
+        OrderItem.id,
+        OrderItem.order_id,
+        OrderItem.product_id,
+        OrderItem.quantity,
+        OrderItem.price,
+    )
+
+
+async def get_order_product_price(
+    db: AsyncSession, order_id: int, product_id: int
+) -> tuple[datetime, Decimal]:
+    """
+    Проверяет заказ и товар одним запросом (заказ LEFT JOIN товар) и
+    возвращает дату заказа (ключ секционирования позиций) и цену товара.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+        ProductNotFoundError: Если товар не найден
+    """
+    row = (
+        await db.execute(
+            select(Order.created_at, Product.price)
+            .select_from(Order)
+            .outerjoin(Product, Product.id == product_id)
+            .where(Order.id == order_id)
+        )
+    ).one_or_none()
+
+    if row is None:
+        raise OrderNotFoundError(order_id)
+    if row.price is None:
+        raise ProductNotFoundError(product_id)
+    return row.created_at, row.price
+
+
+async def add_item_atomic(
+    db: AsyncSession,
+    request: AddItemToOrderRequest,
+) -> OrderItemResponse:
+    """
+    Добавляет товар в заказ одним запросом к БД.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+        ProductNotFoundError: Если товар не найден
+        InsufficientStockError: Если недостаточно товара на складе
+    """
+    statement = build_add_item_statement(
+        request.order_id, request.product_id, request.quantity
+    )
+    row = (await db.execute(statement)).one_or_none()
+
+    if row is None:
+        raise OrderNotFoundError(request.order_id)
+    if row.available is None:
+        raise ProductNotFoundError(request.product_id)
+    if row.id is None:
+        raise InsufficientStockError(request.quantity, row.available)
+
+    await db.commit()
+    return OrderItemResponse.model_validate(row)
+
+
+async def add_items_bulk(db: AsyncSession, request: AddItemsRequest) -> AddItemsResponse:
+    """
+    Добавляет пакет позиций в заказы за фиксированное число запросов к БД.
+
+    1. Одним запросом проверяются все заказы, вторым - блокируются (FOR UPDATE,
+       в порядке id, чтобы не было взаимоблокировок) все товары пакета.
+    2. Остатки проверяются в памяти в порядке следования позиций.
+    3. Одним UPDATE ... FROM (VALUES ...) списываются остатки, одним
+       INSERT ... ON CONFLICT DO UPDATE добавляются позиции.
+
+    В режиме all_or_nothing при любой ошибке транзакция откатывается, а
+    корректные позиции получают код 409.
+    """
+    lines = request.items
+    order_ids = {line.order_id for line in lines}
+    product_ids = {line.product_id for line in lines}
+
+    existing_orders = dict(
+        (await db.execute(select(Order.id, Order.created_at).where(Order.id.in_(order_ids)))).all()
+    )
+    products = {
+        row.id: row
+        for row in await db.execute(
+            select(Product.id, Product.quantity, Product.price)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+    }
+
+    results: list[AddItemResult] = []
+    available = {product_id: row.quantity for product_id, row in products.items()}
+    demand: dict[int, int] = {}
+    accepted: dict[tuple[int, int], int] = {}
+
+    for index, line in enumerate(lines):
+        error: HTTPException | None = None
+        if line.order_id not in existing_orders:
+            error = OrderNotFoundError(line.order_id)
+        elif line.product_id not in products:
+            error = ProductNotFoundError(line.product_id)
+        elif available[line.product_id] < line.quantity:
+            error = InsufficientStockError(line.quantity, available[line.product_id])
+
+        if error is not None:
+            results.append(
+                AddItemResult(index=index, status_code=error.status_code, detail=error.detail)
+            )
+            continue
+
+        available[line.product_id] -= line.quantity
+        demand[line.product_id] = demand.get(line.product_id, 0) + line.quantity
+        key = (line.order_id, line.product_id)
+        accepted[key] = accepted.get(key, 0) + line.quantity
+        results.append(AddItemResult(index=index, status_code=status.HTTP_200_OK))
+
+    failed = any(result.status_code != status.HTTP_200_OK for result in results)
+    if not accepted or (failed and request.mode == "all_or_nothing"):
+        await db.rollback()
+        for result in results:
+            if result.status_code == status.HTTP_200_OK:
+                result.status_code = status.HTTP_409_CONFLICT
+                result.detail = "Позиция не добавлена: в пакете есть ошибки"
+        return AddItemsResponse(applied=False, results=results)
+
+    demand_values = values(
+        column("product_id", Integer), column("quantity", Integer), name="demand"
+    ).data(list(demand.items()))
+    await db.execute(
+        update(Product)
+        .where(Product.id == demand_values.c.product_id)
+        .values(quantity=Product.quantity - demand_values.c.quantity)
+    )
+
+    upsert = build_upsert_items_statement([
+        {
+            "order_id": order_id,
+            "order_created_at": existing_orders[order_id],
+            "product_id": product_id,
+            "quantity": quantity,
+            "price": products[product_id].price,
+        }
+        for (order_id, product_id), quantity in accepted.items()
+    ])
+    items = {
+        (row.order_id, row.product_id): OrderItemResponse.model_validate(row)
+        for row in await db.execute(upsert)
+    }
+    await db.commit()
+
+    for result in results:
+        if result.status_code == status.HTTP_200_OK:
+            line = lines[result.index]
+            result.item = items[(line.order_id, line.product_id)]
+    return AddItemsResponse(applied=True, results=results)
+
+
+# Заказ с позициями, собранный в JSON на стороне PostgreSQL одним запросом.
+# Формат совпадает с сериализацией OrderResponse: created_at в ISO 8601,
+# price строкой.
+ORDER_JSON_QUERY = text(
+    """
+    SELECT json_build_object(
+        'id', o.id,
+        'client_id', o.client_id,
+        'created_at', o.created_at,
+        'total_quantity', o.total_quantity,
+        'total_amount', o.total_amount::text,
+        'items', COALESCE(
+            (
+                SELECT json_agg(
+                    json_build_object(
+                        'id', oi.id,
+                        'order_id', oi.order_id,
+                        'product_id', oi.product_id,
+                        'quantity', oi.quantity,
+                        'price', oi.price::text
+                    )
+                    ORDER BY oi.id
+                )
+                FROM order_items oi
+                WHERE oi.order_id = o.id AND oi.order_created_at = o.created_at
+            ),
+            '[]'::json
+        )
+    )::text
+    FROM orders o
+    WHERE o.id = :order_id
+    """
+)
+
+
+async def load_order_json(db: AsyncSession, order_id: int) -> bytes:
+    """
+    Загружает заказ с позициями готовым JSON одним запросом, без ORM.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+    """
+    payload = await db.scalar(ORDER_JSON_QUERY, {"order_id": order_id})
+    if payload is None:
+        raise OrderNotFoundError(order_id)
+    return payload.encode("utf-8")
+
+
+async def load_order_orm(db: AsyncSession, order_id: int) -> bytes:
+    """
+    Загружает заказ с позициями через ORM (два запроса) и сериализует
+    OrderResponse в JSON.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+    """
+    # populate_existing: позиции могли измениться Core-запросами (add-item)
+    # в этой же сессии, уже загруженную коллекцию нужно перечитать
+    query = (
+        select(Order)
+        .where(Order.id == order_id)
+        .options(selectinload(Order.items))
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(query)
+    order = result.scalar_one_or_none()
+
+    if not order:
+        raise OrderNotFoundError(order_id)
+
+    return dump_json(OrderResponse.model_validate(order))
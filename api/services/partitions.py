@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.db import async_session_factory
+from api.models.orders import PARTITION_NAME_RE
+
+logger = logging.getLogger(__name__)
+
+# Месячные секции приложения создаются и архивируются под одной
+# advisory-блокировкой, чтобы воркеры не делали это одновременно
+PARTITIONS_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('order_partitions'))")
+
+LIST_PARTITIONS = text(
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'orders'::regclass
+    """
+)
+
+# Внешние ключи отсоединенной секции: в архиве секции хранятся отдельно и
+# не должны мешать удалению клиентов, товаров и заказов
+FOREIGN_KEYS = text(
+    """
+    SELECT conname FROM pg_constraint
+    WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+    """
+)
+
+# Итоги клиентов учитывают только заказы в секциях orders
+SUBTRACT_CLIENT_TOTALS = """
+    UPDATE client_totals ct
+    SET orders_count = ct.orders_count - d.orders_count,
+        total_quantity = ct.total_quantity - d.total_quantity,
+        total_amount = ct.total_amount - d.total_amount
+    FROM (
+        SELECT client_id, count(*) AS orders_count,
+               sum(total_quantity) AS total_quantity, sum(total_amount) AS total_amount
+        FROM {table}
+        GROUP BY client_id
+    ) d
+    WHERE ct.client_id = d.client_id
+"""
+
+
+def month_start(day: date) -> date:
+    """Первое число месяца"""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца через `months` месяцев (может быть отрицательным)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Имя месячной секции: orders_p2025_01"""
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+class OrderPartitionManager:
+    """
+    Месячные секции orders и order_items.
+
+    `ensure` создает секции с текущего месяца на `months_ahead` месяцев
+    вперед (одинаковые границы для заказов и позиций, поэтому позиции заказа
+    лежат в секции того же месяца) и, если задан `retention_months`,
+    архивирует секции старше этого числа месяцев. Архивная секция
+    отсоединяется от orders/order_items (DETACH PARTITION) и переносится в
+    схему `archive_schema`: данные остаются доступны для выгрузки, но не
+    участвуют в запросах к заказам и в итогах клиентов. Строки вне созданных
+    секций попадают в секцию DEFAULT и не архивируются.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        months_ahead: int,
+        retention_months: int,
+        archive_schema: str,
+        interval: float,
+    ):
+        self.session_factory = session_factory
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.archive_schema = archive_schema
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def partitions(self) -> list[date]:
+        """Месяцы подключенных секций orders по возрастанию"""
+        async with self.session_factory() as session:
+            names = await session.scalars(LIST_PARTITIONS)
+            matches = [PARTITION_NAME_RE.match(name) for name in names]
+        return sorted(
+            date(int(match[3]), int(match[4]), 1) for match in matches if match and match[3]
+        )
+
+    async def ensure(self, today: date | None = None) -> None:
+        """Создает секции на ближайшие месяцы и архивирует устаревшие"""
+        current = month_start(today or datetime.now(timezone.utc).date())
+        async with self.session_factory() as session:
+            await session.execute(PARTITIONS_LOCK)
+            for offset in range(self.months_ahead + 1):
+                await self._create_month(session, add_months(current, offset))
+            await session.commit()
+        if self.retention_months > 0:
+            await self.archive_before(add_months(current, -self.retention_months))
+
+    async def create_month(self, month: date) -> None:
+        """Создает секции orders и order_items для месяца `month`"""
+        async with self.session_factory() as session:
+            await session.execute(PARTITIONS_LOCK)
+            await self._create_month(session, month_start(month))
+            await session.commit()
+
+    async def archive_before(self, month: date) -> list[date]:
+        """
+        Архивирует секции месяцев раньше `month`, возвращает их месяцы.
+
+        Каждая секция архивируется в своей транзакции: итоги клиентов
+        уменьшаются на заказы секции, затем секции позиций и заказов
+        отсоединяются и переносятся в архивную схему. Отсоединение берет
+        ACCESS EXCLUSIVE на orders и order_items на время транзакции.
+        """
+        archived = []
+        for partition in await self.partitions():
+            if partition >= month_start(month):
+                break
+            async with self.session_factory() as session:
+                await session.execute(PARTITIONS_LOCK)
+                # Порядок блокировок как у записи: позиции, затем заказы
+                await session.execute(
+                    text("LOCK TABLE order_items, orders IN ACCESS EXCLUSIVE MODE")
+                )
+                await self._archive_month(session, partition)
+                await session.commit()
+            archived.append(partition)
+            logger.info("Archived orders partition %s", partition_name("orders", partition))
+        return archived
+
+    def start(self) -> None:
+        """Запускает периодическое обслуживание секций в фоне"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновое обслуживание секций"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.ensure()
+            except Exception:
+                logger.exception("Failed to maintain orders partitions")
+
+    @staticmethod
+    async def _create_month(session: AsyncSession, month: date) -> None:
+        bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        for table in ("orders", "order_items"):
+            await session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+                f"PARTITION OF {table} FOR VALUES {bounds}"
+            ))
+
+    async def _archive_month(self, session: AsyncSession, month: date) -> None:
+        orders = partition_name("orders", month)
+        items = partition_name("order_items", month)
+        await session.execute(text(SUBTRACT_CLIENT_TOTALS.format(table=orders)))
+        await session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{self.archive_schema}"'))
+        # Сначала позиции: секцию заказов нельзя отсоединить, пока на ее
+        # строки ссылается внешний ключ позиций
+        for table, parent in ((items, "order_items"), (orders, "orders")):
+            await session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {table}"))
+            for name in (await session.scalars(FOREIGN_KEYS, {"table": table})).all():
+                await session.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+            await session.execute(text(f'ALTER TABLE {table} SET SCHEMA "{self.archive_schema}"'))
+
+order_partitions = OrderPartitionManager(
+    async_session_factory,
+    months_ahead=settings.ORDERS_PARTITIONS_AHEAD,
+    retention_months=settings.ORDERS_RETENTION_MONTHS,
+    archive_schema=settings.ORDERS_ARCHIVE_SCHEMA,
+    interval=settings.ORDERS_PARTITIONS_INTERVAL,
+)
@@ -0,0 +1,239 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.db import async_session_factory
+from api.models import Product
+from api.schemas import AddItemToOrderRequest, OrderItemResponse
+from .orders import (
+    ProductNotFoundError,
+    InsufficientStockError,
+    build_upsert_items_statement,
+    get_order_product_price,
+)
+
+
+@dataclass
+class _Reservation:
+    """Ожидающий запрос на списание остатка"""
+    quantity: int
+    future: asyncio.Future = field(repr=False)
+
+
+class StockReservationEngine:
+    """
+    Резервирование остатков с объединением записей (write coalescing).
+
+    Параллельные запросы на списание копятся в очереди по каждому товару внутри
+    процесса. Раз в `flush_interval` секунд (или сразу при накоплении
+    `max_batch_size` запросов) очередь сбрасывается одной короткой транзакцией:
+    строки товаров блокируются, запросы удовлетворяются в порядке поступления
+    (FIFO), пока хватает остатка, и все списания применяются одним
+    `UPDATE products ... FROM (VALUES ...)`. Так горячая строка товара
+    блокируется один раз за тик, а не на каждый запрос.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float,
+        max_batch_size: int,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._queues: dict[int, deque[_Reservation]] = {}
+        self._pending = 0
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def reserve(self, product_id: int, quantity: int) -> None:
+        """
+        Резервирует (списывает) `quantity` единиц товара.
+
+        Raises:
+            ProductNotFoundError: Если товар не найден
+            InsufficientStockError: Если недостаточно товара на складе
+        """
+        self._ensure_started()
+        reservation = _Reservation(quantity, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(product_id, deque()).append(reservation)
+        self._pending += 1
+        if self._pending >= self.max_batch_size:
+            self._wakeup.set()
+        await reservation.future
+
+    async def release(self, product_id: int, quantity: int) -> None:
+        """Возвращает ранее зарезервированный остаток (компенсация)"""
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(quantity=Product.quantity + quantity)
+            )
+            await session.commit()
+
+    async def flush(self) -> None:
+        """Сбрасывает накопленные запросы одной транзакцией"""
+        batch = self._take_batch()
+        if not batch:
+            return
+
+        outcomes: list[tuple[_Reservation, HTTPException | None]] = []
+        try:
+            async with self.session_factory() as session:
+                stock = dict(
+                    (
+                        await session.execute(
+                            select(Product.id, Product.quantity)
+                            .where(Product.id.in_(batch))
+                            .order_by(Product.id)
+                            .with_for_update()
+                        )
+                    ).all()
+                )
+
+                decrements: dict[int, int] = {}
+                for product_id, reservations in batch.items():
+                    available = stock.get(product_id)
+                    for reservation in reservations:
+                        if available is None:
+                            outcomes.append((reservation, ProductNotFoundError(product_id)))
+                        elif available < reservation.quantity:
+                            outcomes.append((
+                                reservation,
+                                InsufficientStockError(reservation.quantity, available),
+                            ))
+                        else:
+                            available -= reservation.quantity
+                            decrements[product_id] = (
+                                decrements.get(product_id, 0) + reservation.quantity
+                            )
+                            outcomes.append((reservation, None))
+
+                if decrements:
+                    demand = values(
+                        column("product_id", Integer),
+                        column("quantity", Integer),
+                        name="demand",
+                    ).data(list(decrements.items()))
+                    await session.execute(
+                        update(Product)
+                        .where(
+                            Product.id == demand.c.product_id,
+                            Product.quantity >= demand.c.quantity,
+                        )
+                        .values(quantity=Product.quantity - demand.c.quantity)
+                    )
+                await session.commit()
+        except Exception as exc:
+            for reservations in batch.values():
+                for reservation in reservations:
+                    if not reservation.future.done():
+                        reservation.future.set_exception(exc)
+            return
+
+        for reservation, error in outcomes:
+            if reservation.future.done():
+                continue
+            if error is None:
+                reservation.future.set_result(None)
+            else:
+                reservation.future.set_exception(error)
+
+    async def stop(self) -> None:
+        """Останавливает фоновый сброс, дообработав очередь"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while self._pending:
+            await self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                await self.flush()
+
+    def _take_batch(self) -> dict[int, list[_Reservation]]:
+        """Забирает из очередей до max_batch_size запросов, сохраняя FIFO"""
+        batch: dict[int, list[_Reservation]] = {}
+        taken = 0
+        for product_id in list(self._queues):
+            queue = self._queues[product_id]
+            while queue and taken < self.max_batch_size:
+                reservation = queue.popleft()
+                self._pending -= 1
+                # Запрос мог быть отменен (клиент отключился) - не списываем
+                if reservation.future.cancelled():
+                    continue
+                batch.setdefault(product_id, []).append(reservation)
+                taken += 1
+            if not queue:
+                del self._queues[product_id]
+            if taken >= self.max_batch_size:
+                break
+        return batch
+
+
+stock_reservations = StockReservationEngine(
+    async_session_factory,
+    flush_interval=settings.STOCK_FLUSH_INTERVAL,
+    max_batch_size=settings.STOCK_FLUSH_MAX_BATCH,
+)
+
+
+async def add_item_coalesced(
+    db: AsyncSession,
+    request: AddItemToOrderRequest,
+    reservations: StockReservationEngine,
+) -> OrderItemResponse:
+    """
+    Добавляет товар в заказ, списывая остаток через движок резервирования.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+        ProductNotFoundError: Если товар не найден
+        InsufficientStockError: Если недостаточно товара на складе
+    """
+    order_created_at, price = await get_order_product_price(db, request.order_id, request.product_id)
+
+    await reservations.reserve(request.product_id, request.quantity)
+    try:
+        result = await db.execute(build_upsert_items_statement([{
+            "order_id": request.order_id,
+            "order_created_at": order_created_at,
+            "product_id": request.product_id,
+            "quantity": request.quantity,
+            "price": price,
+        }]))
+        item = OrderItemResponse.model_validate(result.one())
+        await db.commit()
+    except BaseException:
+        await reservations.release(request.product_id, request.quantity)
+        raise
+    return item
+
+
+def get_stock_reservations() -> StockReservationEngine:
+    """Dependency для получения движка резервирования остатков"""
+    return stock_reservations
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from api.core.config import settings
+from api.db import async_session_factory
+from api.models import Category, Product, ProductSalesDaily, ProductSalesPending
+from api.schemas import TopProductResponse
+
+logger = logging.getLogger(__name__)
+
+
+class SalesRollup:
+    """
+    Перенос журнала продаж (product_sales_pending) в дневные итоги
+    (product_sales_daily).
+
+    Раз в `interval` секунд журнал переносится одним запросом:
+    `DELETE ... RETURNING` забирает накопленные строки, они суммируются по
+    (товар, день) и прибавляются к итогам через `INSERT ... ON CONFLICT DO
+    UPDATE`. Строки, вставленные параллельно, остаются до следующего переноса;
+    одновременный перенос из нескольких процессов не считает строку дважды -
+    удалить ее может только один из них.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def flush(self) -> int:
+        """Переносит журнал в дневные итоги, возвращает число обновленных итогов"""
+        moved = (
+            delete(ProductSalesPending)
+            .returning(
+                ProductSalesPending.product_id,
+                ProductSalesPending.day,
+                ProductSalesPending.quantity,
+                ProductSalesPending.revenue,
+            )
+            .cte("moved")
+        )
+        statement = insert(ProductSalesDaily).from_select(
+            ["product_id", "day", "quantity", "revenue"],
+            select(
+                moved.c.product_id,
+                moved.c.day,
+                func.sum(moved.c.quantity),
+                func.sum(moved.c.revenue),
+            ).group_by(moved.c.product_id, moved.c.day),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ProductSalesDaily.product_id, ProductSalesDaily.day],
+            set_={
+                "quantity": ProductSalesDaily.quantity + statement.excluded.quantity,
+                "revenue": ProductSalesDaily.revenue + statement.excluded.revenue,
+            },
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            await session.commit()
+        return result.rowcount
+
+    def start(self) -> None:
+        """Запускает периодический перенос в фоне"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновый перенос, перенеся остаток журнала"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush product sales rollup")
+
+
+sales_rollup = SalesRollup(async_session_factory, interval=settings.SALES_ROLLUP_INTERVAL)
+
+
+async def get_top_products(
+    db: AsyncSession,
+    days: int,
+    limit: int,
+    today: date | None = None,
+) -> list[TopProductResponse]:
+    """
+    Самые продаваемые товары за последние `days` дней (включая сегодня, UTC).
+
+    Суммирует дневные итоги за окно и еще не перенесенный журнал, поэтому
+    результат актуален сразу после добавления товара в заказ, а стоимость
+    запроса зависит от числа дней и товаров, а не от числа позиций заказов.
+    """
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+    window_start = today - timedelta(days=days - 1)
+
+    sales = union_all(
+        select(
+            ProductSalesDaily.product_id,
+            ProductSalesDaily.quantity,
+            ProductSalesDaily.revenue,
+        ).where(ProductSalesDaily.day >= window_start),
+        select(
+            ProductSalesPending.product_id,
+            ProductSalesPending.quantity,
+            ProductSalesPending.revenue,
+        ).where(ProductSalesPending.day >= window_start),
+    ).subquery("sales")
+    quantity = func.sum(sales.c.quantity)
+    top = (
+        select(
+            sales.c.product_id,
+            quantity.label("quantity"),
+            func.sum(sales.c.revenue).label("revenue"),
+        )
+        .group_by(sales.c.product_id)
+        .having(quantity > 0)
+        .order_by(quantity.desc(), sales.c.product_id)
+        .limit(limit)
+        .subquery("top")
+    )
+
+    root = aliased(Category)
+    rows = await db.execute(
+        select(
+            top.c.product_id,
+            Product.name.label("product_name"),
+            root.name.label("root_category_name"),
+            top.c.quantity,
+            top.c.revenue,
+        )
+        .join(Product, Product.id == top.c.product_id)
+        .outerjoin(Category, Category.id == Product.category_id)
+        .outerjoin(root, root.id == Category.root_category_id)
+        .order_by(top.c.quantity.desc(), top.c.product_id)
+    )
+    return [TopProductResponse.model_validate(row) for row in rows]
@@ -0,0 +1,222 @@
+from sqlalchemy import Integer, column, delete, func, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from api.models import Product, ProductStockShard
+from api.schemas import (
+    AddItemToOrderRequest,
+    OrderItemResponse,
+    ProductStockResponse,
+    StockShardResponse,
+)
+from .orders import (
+    ProductNotFoundError,
+    InsufficientStockError,
+    build_upsert_items_statement,
+    get_order_product_price,
+)
+
+
+async def take_stock(db: AsyncSession, product_id: int, quantity: int) -> None:
+    """
+    Списывает остаток товара с шардированного счетчика.
+
+    Быстрый путь - один UPDATE (в savepoint) случайного шарда, в котором
+    хватает остатка и который не заблокирован другой транзакцией
+    (FOR UPDATE SKIP LOCKED).
+    Если такого шарда нет, блокируются товар и все его шарды, и количество
+    списывается по частям: сначала с products.quantity, затем с самых
+    наполненных шардов. Для товара без шардов это обычное списание с
+    products.quantity.
+
+    Raises:
+        ProductNotFoundError: Если товар не найден
+        InsufficientStockError: Если недостаточно товара на складе
+    """
+    candidate = aliased(ProductStockShard)
+    savepoint = await db.begin_nested()
+    picked_shard = await db.scalar(
+        update(ProductStockShard)
+        .where(
+            ProductStockShard.product_id == product_id,
+            ProductStockShard.quantity >= quantity,
+            ProductStockShard.shard == (
+                select(candidate.shard)
+                .where(candidate.product_id == product_id, candidate.quantity >= quantity)
+                .order_by(func.random())
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            ),
+        )
+        .values(quantity=ProductStockShard.quantity - quantity)
+        .returning(ProductStockShard.shard)
+    )
+    if picked_shard is not None:
+        await savepoint.commit()
+        return
+    # Шард, остаток которого изменился между чтением и блокировкой, SKIP LOCKED
+    # пропускает, но оставляет заблокированным. Откатываем savepoint, чтобы не
+    # держать такие блокировки в медленном пути (иначе - взаимоблокировка).
+    await savepoint.rollback()
+
+    # Медленный путь. Порядок блокировок (товар, затем шарды по номеру)
+    # совпадает с split_stock/merge_stock, чтобы не было взаимоблокировок.
+    # FOR NO KEY UPDATE не конфликтует с FK-проверками вставки order_items.
+    product_quantity, shards = await _lock_stock(db, product_id)
+
+    available = product_quantity + sum(shard.quantity for shard in shards)
+    if available < quantity:
+        raise InsufficientStockError(quantity, available)
+
+    remaining = quantity
+    from_product = min(product_quantity, remaining)
+    if from_product:
+        await db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(quantity=Product.quantity - from_product)
+        )
+        remaining -= from_product
+
+    decrements = []
+    for shard in sorted(shards, key=lambda row: row.quantity, reverse=True):
+        if not remaining:
+            break
+        take = min(shard.quantity, remaining)
+        if take:
+            decrements.append((shard.shard, take))
+            remaining -= take
+
+    if decrements:
+        demand = values(
+            column("shard", Integer), column("quantity", Integer), name="demand"
+        ).data(decrements)
+        await db.execute(
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.product_id == product_id,
+                ProductStockShard.shard == demand.c.shard,
+            )
+            .values(quantity=ProductStockShard.quantity - demand.c.quantity)
+        )
+
+
+async def add_item_sharded(
+    db: AsyncSession,
+    request: AddItemToOrderRequest,
+) -> OrderItemResponse:
+    """
+    Добавляет товар в заказ, списывая остаток с шардированного счетчика.
+
+    Raises:
+        OrderNotFoundError: Если заказ не найден
+        ProductNotFoundError: Если товар не найден
+        InsufficientStockError: Если недостаточно товара на складе
+    """
+    order_created_at, price = await get_order_product_price(db, request.order_id, request.product_id)
+    await take_stock(db, request.product_id, request.quantity)
+
+    result = await db.execute(build_upsert_items_statement([{
+        "order_id": request.order_id,
+        "order_created_at": order_created_at,
+        "product_id": request.product_id,
+        "quantity": request.quantity,
+        "price": price,
+    }]))
+    item = OrderItemResponse.model_validate(result.one())
+    await db.commit()
+    return item
+
+
+async def get_product_stock(db: AsyncSession, product_id: int) -> ProductStockResponse:
+    """
+    Возвращает остаток товара с разбивкой по шардам.
+
+    Raises:
+        ProductNotFoundError: Если товар не найден
+    """
+    product_quantity = await db.scalar(select(Product.quantity).where(Product.id == product_id))
+    if product_quantity is None:
+        raise ProductNotFoundError(product_id)
+
+    shards = [
+        StockShardResponse.model_validate(row)
+        for row in await db.execute(
+            select(ProductStockShard.shard, ProductStockShard.quantity)
+            .where(ProductStockShard.product_id == product_id)
+            .order_by(ProductStockShard.shard)
+        )
+    ]
+    return ProductStockResponse(
+        product_id=product_id,
+        quantity=product_quantity + sum(shard.quantity for shard in shards),
+        unsharded_quantity=product_quantity,
+        shards=shards,
+    )
+
+
+async def _lock_stock(db: AsyncSession, product_id: int):
+    """
+    Блокирует товар и все его шарды.
+
+    Returns:
+        Остаток в products.quantity и список шардов (shard, quantity)
+    """
+    product_quantity = await db.scalar(
+        select(Product.quantity)
+        .where(Product.id == product_id)
+        .with_for_update(key_share=True)
+    )
+    if product_quantity is None:
+        raise ProductNotFoundError(product_id)
+
+    shards = (
+        await db.execute(
+            select(ProductStockShard.shard, ProductStockShard.quantity)
+            .where(ProductStockShard.product_id == product_id)
+            .order_by(ProductStockShard.shard)
+            .with_for_update()
+        )
+    ).all()
+    return product_quantity, shards
+
+
+async def split_stock(db: AsyncSession, product_id: int, shards: int) -> ProductStockResponse:
+    """
+    Разбивает (или перебалансирует) остаток товара на `shards` равных шардов.
+
+    Raises:
+        ProductNotFoundError: Если товар не найден
+    """
+    product_quantity, current_shards = await _lock_stock(db, product_id)
+    total = product_quantity + sum(shard.quantity for shard in current_shards)
+
+    await db.execute(delete(ProductStockShard).where(ProductStockShard.product_id == product_id))
+    base, extra = divmod(total, shards)
+    await db.execute(
+        insert(ProductStockShard),
+        [
+            {"product_id": product_id, "shard": shard, "quantity": base + 1 if shard < extra else base}
+            for shard in range(shards)
+        ],
+    )
+    await db.execute(update(Product).where(Product.id == product_id).values(quantity=0))
+    await db.commit()
+    return await get_product_stock(db, product_id)
+
+
+async def merge_stock(db: AsyncSession, product_id: int) -> ProductStockResponse:
+    """
+    Собирает остаток из всех шардов обратно в products.quantity.
+
+    Raises:
+        ProductNotFoundError: Если товар не найден
+    """
+    product_quantity, shards = await _lock_stock(db, product_id)
+    total = product_quantity + sum(shard.quantity for shard in shards)
+
+    await db.execute(delete(ProductStockShard).where(ProductStockShard.product_id == product_id))
+    await db.execute(update(Product).where(Product.id == product_id).values(quantity=total))
+    await db.commit()
+    return await get_product_stock(db, product_id)
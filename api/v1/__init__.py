@@ -1,4 +1,7 @@
 from .orders import router as orders_router
+from .admin import router as admin_router
+from .categories import router as categories_router
+from .reports import router as reports_router
+from .clients import router as clients_router
 
-__all__ = ["orders_router"]
-
+__all__ = ["orders_router", "admin_router", "categories_router", "reports_router", "clients_router"]
@@ -0,0 +1,195 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import CacheBackend, get_order_cache
+from api.db import MeteredQueuePool, engine, get_db
+from api.schemas import (
+    StockShardsRequest,
+    ProductStockResponse,
+    CacheStatsResponse,
+    PoolStatsResponse,
+    ReconciliationResponse,
+    ErrorResponse,
+)
+from api.services import (
+    ClientTotalsReconciler,
+    get_client_totals_reconciler,
+    get_product_stock,
+    merge_stock,
+    split_stock,
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get(
+    "/products/{product_id}/stock",
+    response_model=ProductStockResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Товар не найден"},
+    },
+    summary="Остаток товара по шардам",
+    description="Возвращает общий остаток товара и его разбивку по шардам счетчика",
+)
+async def get_stock(
+    product_id: int,
+    db: AsyncSession = Depends(get_db),
+) -> ProductStockResponse:
+    """
+    Получает остаток товара.
+    
+    Args:
+        product_id: ID товара
+        db: Сессия базы данных
+        
+    Returns:
+        ProductStockResponse: Остаток с разбивкой по шардам
+    """
+    return await get_product_stock(db, product_id)
+
+
+@router.put(
+    "/products/{product_id}/stock-shards",
+    response_model=ProductStockResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Товар не найден"},
+    },
+    summary="Разбиение остатка товара на шарды",
+    description="""
+    Разбивает общий остаток товара на N равных шардов (или перебалансирует
+    существующие). Используется для "горячих" товаров вместе с
+    `ADD_ITEM_MODE=sharded`: параллельные списания блокируют разные строки.
+    """,
+)
+async def split_stock_shards(
+    product_id: int,
+    request: StockShardsRequest,
+    db: AsyncSession = Depends(get_db),
+) -> ProductStockResponse:
+    """
+    Разбивает остаток товара на шарды.
+    
+    Args:
+        product_id: ID товара
+        request: Количество шардов
+        db: Сессия базы данных
+        
+    Returns:
+        ProductStockResponse: Остаток с разбивкой по шардам
+    """
+    return await split_stock(db, product_id, request.shards)
+
+
+@router.delete(
+    "/products/{product_id}/stock-shards",
+    response_model=ProductStockResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Товар не найден"},
+    },
+    summary="Слияние шардов остатка товара",
+    description="Переносит остаток из всех шардов обратно в products.quantity",
+)
+async def merge_stock_shards(
+    product_id: int,
+    db: AsyncSession = Depends(get_db),
+) -> ProductStockResponse:
+    """
+    Сливает шарды остатка товара.
+    
+    Args:
+        product_id: ID товара
+        db: Сессия базы данных
+        
+    Returns:
+        ProductStockResponse: Остаток без шардов
+    """
+    return await merge_stock(db, product_id)
+
+
+@router.get(
+    "/cache/orders",
+    response_model=CacheStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша заказов",
+    description="Счетчики попаданий, промахов и вытеснений кэша GET /orders/{order_id}",
+)
+async def get_order_cache_stats(
+    cache: CacheBackend = Depends(get_order_cache),
+) -> CacheStatsResponse:
+    """
+    Возвращает статистику кэша заказов текущего процесса.
+    
+    Args:
+        cache: Кэш заказов
+        
+    Returns:
+        CacheStatsResponse: Счетчики кэша
+    """
+    return CacheStatsResponse(
+        backend=cache.name,
+        size=cache.size,
+        hit_ratio=cache.stats.hit_ratio,
+        **vars(cache.stats),
+    )
+
+
+@router.get(
+    "/db/pool",
+    response_model=PoolStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Статистика пула соединений",
+    description="Занятость пула соединений с БД и время ожидания соединения",
+)
+async def get_pool_stats() -> PoolStatsResponse:
+    """
+    Возвращает состояние пула соединений текущего процесса.
+    
+    Returns:
+        PoolStatsResponse: Занятость пула и счетчики ожидания
+    """
+    pool: MeteredQueuePool = engine.pool
+    metrics = pool.metrics
+    return PoolStatsResponse(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        checkouts=metrics.checkouts,
+        timeouts=metrics.timeouts,
+        wait_avg_ms=metrics.wait_avg * 1000,
+        wait_max_ms=metrics.wait_max * 1000,
+        pings=metrics.pings,
+        reconnects=metrics.reconnects,
+    )
+
+
+@router.post(
+    "/client-totals/reconcile",
+    response_model=ReconciliationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Сверка итогов клиентов и заказов",
+    description="""
+    Пересчитывает итоги заказов и клиентов по позициям заказов параллельными
+    частями (`RECONCILE_CHUNK_SIZE` клиентов, `RECONCILE_CONCURRENCY` частей
+    одновременно) и возвращает расхождения с сохраненными итогами.
+    С `fix=true` расхождения исправляются.
+    """,
+)
+async def reconcile_client_totals(
+    fix: bool = Query(False, description="Исправить найденные расхождения"),
+    reconciler: ClientTotalsReconciler = Depends(get_client_totals_reconciler),
+) -> ReconciliationResponse:
+    """
+    Сверяет итоги клиентов и заказов.
+    
+    Args:
+        fix: Исправить найденные расхождения
+        reconciler: Сверка итогов
+        
+    Returns:
+        ReconciliationResponse: Найденные расхождения
+    """
+    return await reconciler.run(fix=fix)
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.db import get_db, get_read_db
+from api.schemas import (
+    CategoryCreateRequest,
+    CategoryUpdateRequest,
+    CategoryResponse,
+    CategoryDetailResponse,
+    ProductResponse,
+    ErrorResponse,
+)
+from api.services import (
+    CategoryTreeIndex,
+    create_category,
+    get_category_detail,
+    get_category_index,
+    list_subtree_products,
+    update_category,
+)
+
+router = APIRouter(prefix="/categories", tags=["categories"])
+
+
+@router.get(
+    "",
+    response_model=list[CategoryResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Дерево категорий",
+    description="Все категории в порядке обхода дерева в глубину (родитель перед потомками)",
+)
+async def list_categories(
+    index: CategoryTreeIndex = Depends(get_category_index),
+) -> list[CategoryResponse]:
+    """
+    Возвращает все категории из индекса дерева.
+
+    Args:
+        index: Индекс дерева категорий
+
+    Returns:
+        list[CategoryResponse]: Категории в порядке обхода дерева
+    """
+    tree = await index.get()
+    return [CategoryResponse(**vars(node)) for node in tree.nodes()]
+
+
+@router.get(
+    "/{category_id}",
+    response_model=CategoryDetailResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Категория не найдена"},
+    },
+    summary="Получение категории",
+    description="Категория с путем от корня, прямыми потомками и размером поддерева",
+)
+async def get_category(
+    category_id: int,
+    index: CategoryTreeIndex = Depends(get_category_index),
+) -> CategoryDetailResponse:
+    """
+    Получает категорию из индекса дерева.
+
+    Args:
+        category_id: ID категории
+        index: Индекс дерева категорий
+
+    Returns:
+        CategoryDetailResponse: Категория с предками и потомками
+
+    Raises:
+        HTTPException 404: Если категория не найдена
+    """
+    return get_category_detail(await index.get(), category_id)
+
+
+@router.get(
+    "/{category_id}/products",
+    response_model=list[ProductResponse],
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Категория не найдена"},
+    },
+    summary="Товары категории с подкатегориями",
+    description="""
+    Товары категории и всех ее потомков. Поддерево берется из индекса дерева
+    в памяти, товары выбираются одним запросом `category_id = ANY(...)`.
+    """,
+)
+async def get_category_products(
+    category_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    index: CategoryTreeIndex = Depends(get_category_index),
+) -> list[ProductResponse]:
+    """
+    Получает товары поддерева категории.
+
+    Args:
+        category_id: ID категории
+        limit: Сколько товаров вернуть
+        offset: Сколько товаров пропустить
+        db: Сессия базы данных
+        index: Индекс дерева категорий
+
+    Returns:
+        list[ProductResponse]: Товары, упорядоченные по id
+
+    Raises:
+        HTTPException 404: Если категория не найдена
+    """
+    return await list_subtree_products(db, await index.get(), category_id, limit, offset)
+
+
+@router.post(
+    "",
+    response_model=CategoryResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        404: {"model": ErrorResponse, "description": "Родительская категория не найдена"},
+        409: {"model": ErrorResponse, "description": "Категория с таким названием уже есть"},
+    },
+    summary="Создание категории",
+)
+async def add_category(
+    request: CategoryCreateRequest,
+    db: AsyncSession = Depends(get_db),
+    index: CategoryTreeIndex = Depends(get_category_index),
+) -> CategoryResponse:
+    """
+    Создает категорию.
+
+    Args:
+        request: Название и родитель
+        db: Сессия базы данных
+        index: Индекс дерева категорий (перестраивается после изменения)
+
+    Returns:
+        CategoryResponse: Созданная категория
+    """
+    return await create_category(db, index, request)
+
+
+@router.patch(
+    "/{category_id}",
+    response_model=CategoryResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Категория или родитель не найдены"},
+        409: {"model": ErrorResponse, "description": "Перенос в свое поддерево или дубль названия"},
+    },
+    summary="Изменение категории",
+    description="Переименование и/или перенос категории вместе со всем поддеревом",
+)
+async def patch_category(
+    category_id: int,
+    request: CategoryUpdateRequest,
+    db: AsyncSession = Depends(get_db),
+    index: CategoryTreeIndex = Depends(get_category_index),
+) -> CategoryResponse:
+    """
+    Изменяет категорию.
+
+    Args:
+        category_id: ID категории
+        request: Новые название и/или родитель
+        db: Сессия базы данных
+        index: Индекс дерева категорий (перестраивается после изменения)
+
+    Returns:
+        CategoryResponse: Категория после изменения
+    """
+    return await update_category(db, index, category_id, request)
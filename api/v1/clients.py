@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.db import get_read_db
+from api.schemas import ClientTotalsResponse, ErrorResponse
+from api.services import get_client_totals, list_client_totals
+
+router = APIRouter(prefix="/clients", tags=["clients"])
+
+
+@router.get(
+    "/totals",
+    response_model=list[ClientTotalsResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Суммы заказов по клиентам",
+    description="""
+    Клиенты по убыванию суммы заказанных товаров. Итоги читаются из
+    `client_totals`, которые триггеры обновляют при каждом изменении заказов,
+    без join `clients`/`orders`/`order_items`.
+    """,
+)
+async def list_totals(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[ClientTotalsResponse]:
+    """
+    Получает итоги клиентов.
+
+    Args:
+        limit: Сколько клиентов вернуть
+        offset: Сколько клиентов пропустить
+        db: Сессия базы данных
+
+    Returns:
+        list[ClientTotalsResponse]: Итоги по убыванию суммы
+    """
+    return await list_client_totals(db, limit, offset)
+
+
+@router.get(
+    "/{client_id}/totals",
+    response_model=ClientTotalsResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Клиент не найден"},
+    },
+    summary="Сумма заказов клиента",
+    description="Число заказов, количество и сумма заказанных клиентом товаров",
+)
+async def get_totals(
+    client_id: int,
+    db: AsyncSession = Depends(get_read_db),
+) -> ClientTotalsResponse:
+    """
+    Получает итоги клиента.
+
+    Args:
+        client_id: ID клиента
+        db: Сессия базы данных
+
+    Returns:
+        ClientTotalsResponse: Итоги клиента
+
+    Raises:
+        HTTPException 404: Если клиент не найден
+    """
+    return await get_client_totals(db, client_id)
@@ -1,17 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
-from api.db import get_db
+from api.cache import CacheBackend, get_order_cache, order_cache_key
+from api.core.config import settings
+from api.core.responses import ModelResponse
+from api.db import ReplicaRouter, get_db, get_read_db, get_replica_router
 from api.models import Order, OrderItem, Product
 from api.schemas import (
     AddItemToOrderRequest,
+    AddItemsRequest,
     OrderItemResponse,
+    OrderResponse,
+    AddItemsResponse,
     ErrorResponse,
 )
+from api.services import (
+    OrderNotFoundError,
+    ProductNotFoundError,
+    InsufficientStockError,
+    StockReservationEngine,
+    add_item_atomic,
+    add_item_coalesced,
+    add_item_sharded,
+    add_items_bulk,
+    get_stock_reservations,
+    load_order_json,
+    load_order_orm,
+)
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+# Ответы сериализуются pydantic-core напрямую в байты (см. ModelResponse),
+# response_model используется только для документации
+router = APIRouter(prefix="/orders", tags=["orders"], default_response_class=ModelResponse)
 
 
 @router.post(
@@ -27,7 +47,7 @@ router = APIRouter(prefix="/orders", tags=["orders"])
     description="""
     Добавляет товар в заказ. Если товар уже есть в заказе, его количество увеличивается.
     
-    **Бизнес-логика:**
+    **Бизнес-логика** (в режиме `atomic` выполняется одним SQL-запросом):
     - Проверяет существование заказа
     - Проверяет существование товара
     - Проверяет наличие товара на складе
@@ -39,32 +59,55 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 async def add_item_to_order(
     request: AddItemToOrderRequest,
     db: AsyncSession = Depends(get_db),
-) -> OrderItemResponse:
+    reservations: StockReservationEngine = Depends(get_stock_reservations),
+    cache: CacheBackend = Depends(get_order_cache),
+    replicas: ReplicaRouter = Depends(get_replica_router),
+) -> ModelResponse:
     """
     Добавляет товар в заказ.
     
     Args:
         request: Запрос с ID заказа, ID товара и количеством
         db: Сессия базы данных
+        reservations: Движок резервирования остатков (режим coalesced)
+        cache: Кэш заказов (инвалидируется после изменения)
+        replicas: Маршрутизатор чтений (клиент привязывается к primary)
         
     Returns:
-        OrderItemResponse: Информация о позиции заказа
+        ModelResponse: Информация о позиции заказа (OrderItemResponse)
         
     Raises:
         HTTPException 404: Если заказ или товар не найдены
         HTTPException 422: Если недостаточно товара на складе
     """
+    if settings.ADD_ITEM_MODE == "atomic":
+        item = await add_item_atomic(db, request)
+    elif settings.ADD_ITEM_MODE == "coalesced":
+        item = await add_item_coalesced(db, request, reservations)
+    elif settings.ADD_ITEM_MODE == "sharded":
+        item = await add_item_sharded(db, request)
+    else:
+        item = await _add_item_orm(db, request)
     
+    await cache.delete(order_cache_key(request.order_id))
+    response = ModelResponse(item)
+    replicas.stick_to_primary(response)
+    return response
+
+
+async def _add_item_orm(
+    db: AsyncSession,
+    request: AddItemToOrderRequest,
+) -> OrderItemResponse:
+    """Добавляет товар в заказ через ORM (режим ADD_ITEM_MODE="orm")"""
+
     # 1. Проверяем существование заказа
     order_query = select(Order).where(Order.id == request.order_id)
     order_result = await db.execute(order_query)
     order = order_result.scalar_one_or_none()
     
     if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Заказ с ID {request.order_id} не найден",
-        )
+        raise OrderNotFoundError(request.order_id)
     
     # 2. Проверяем существование товара и его количество
     product_query = select(Product).where(Product.id == request.product_id)
@@ -72,24 +115,16 @@ async def add_item_to_order(
     product = product_result.scalar_one_or_none()
     
     if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Товар с ID {request.product_id} не найден",
-        )
+        raise ProductNotFoundError(request.product_id)
     
     # 3. Проверяем наличие товара на складе
     if product.quantity < request.quantity:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=(
-                f"Недостаточно товара на складе. "
-                f"Запрошено: {request.quantity}, доступно: {product.quantity}"
-            ),
-        )
+        raise InsufficientStockError(request.quantity, product.quantity)
     
     # 4. Проверяем, есть ли товар уже в заказе
     order_item_query = select(OrderItem).where(
         OrderItem.order_id == request.order_id,
+        OrderItem.order_created_at == order.created_at,
         OrderItem.product_id == request.product_id,
     )
     order_item_result = await db.execute(order_item_query)
@@ -102,6 +137,7 @@ async def add_item_to_order(
         # Товара нет в заказе - создаем новую позицию
         order_item = OrderItem(
             order_id=request.order_id,
+            order_created_at=order.created_at,
             product_id=request.product_id,
             quantity=request.quantity,
             price=product.price,
@@ -111,62 +147,109 @@ async def add_item_to_order(
     # 5. Уменьшаем количество товара на складе
     product.quantity -= request.quantity
     
-    # 6. Сохраняем изменения
+    # 6. Сохраняем изменения. id новой позиции приходит в RETURNING при
+    # INSERT, а атрибуты не истекают после commit (expire_on_commit=False) -
+    # refresh (лишний SELECT) не нужен
     await db.commit()
-    await db.refresh(order_item)
     
     return OrderItemResponse.model_validate(order_item)
 
 
+@router.post(
+    "/add-items",
+    response_model=AddItemsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Пакетное добавление товаров в заказы",
+    description="""
+    Добавляет список позиций (в один или несколько заказов) в одной транзакции
+    за фиксированное число запросов к БД, независимо от количества позиций.
+    
+    Для каждой позиции возвращается результат с тем же кодом и текстом ошибки,
+    что и у `/add-item`. Режимы:
+    - `all_or_nothing` - при ошибке в любой позиции ничего не сохраняется (`applied=false`)
+    - `best_effort` - сохраняются все позиции, прошедшие проверки
+    """,
+)
+async def add_items_to_orders(
+    request: AddItemsRequest,
+    db: AsyncSession = Depends(get_db),
+    cache: CacheBackend = Depends(get_order_cache),
+    replicas: ReplicaRouter = Depends(get_replica_router),
+) -> ModelResponse:
+    """
+    Пакетно добавляет товары в заказы.
+    
+    Args:
+        request: Список позиций и режим обработки ошибок
+        db: Сессия базы данных
+        cache: Кэш заказов (инвалидируется после изменения)
+        replicas: Маршрутизатор чтений (клиент привязывается к primary)
+        
+    Returns:
+        ModelResponse: Результаты по каждой позиции (AddItemsResponse)
+    """
+    response = await add_items_bulk(db, request)
+    
+    if response.applied:
+        changed_orders = {
+            request.items[result.index].order_id
+            for result in response.results
+            if result.status_code == status.HTTP_200_OK
+        }
+        await cache.delete(*(order_cache_key(order_id) for order_id in changed_orders))
+    
+    result = ModelResponse(response)
+    if response.applied:
+        replicas.stick_to_primary(result)
+    return result
+
+
 @router.get(
     "/{order_id}",
-    response_model=dict,
+    response_model=OrderResponse,
     status_code=status.HTTP_200_OK,
     responses={
         404: {"model": ErrorResponse, "description": "Заказ не найден"},
     },
     summary="Получение информации о заказе",
-    description="Возвращает полную информацию о заказе со всеми позициями",
+    description="""
+    Возвращает полную информацию о заказе со всеми позициями.
+    
+    В режиме `ORDER_READ_MODE=json` заказ собирается в JSON на стороне PostgreSQL
+    одним запросом (`json_agg`) и отдается без ORM и повторной сериализации.
+    
+    Ответ кэшируется (`ORDER_CACHE_BACKEND`) и инвалидируется при добавлении товаров в заказ.
+    
+    Заказ читается с реплики (`DB_REPLICA_URLS`); после добавления товаров клиент
+    в течение `DB_STICKY_PRIMARY_SECONDS` читает из primary.
+    """,
 )
 async def get_order(
     order_id: int,
-    db: AsyncSession = Depends(get_db),
-) -> dict:
+    db: AsyncSession = Depends(get_read_db),
+    cache: CacheBackend = Depends(get_order_cache),
+) -> ModelResponse:
     """
     Получает информацию о заказе.
     
     Args:
         order_id: ID заказа
-        db: Сессия базы данных
+        db: Сессия базы данных (реплика или primary)
+        cache: Кэш сериализованных ответов
         
     Returns:
-        dict: Информация о заказе с позициями
+        ModelResponse: Информация о заказе с позициями (OrderResponse)
         
     Raises:
         HTTPException 404: Если заказ не найден
     """
-    query = select(Order).where(Order.id == order_id).options(selectinload(Order.items))
-    result = await db.execute(query)
-    order = result.scalar_one_or_none()
+    key = order_cache_key(order_id)
+    payload = await cache.get(key)
+    if payload is None:
+        if settings.ORDER_READ_MODE == "json":
+            payload = await load_order_json(db, order_id)
+        else:
+            payload = await load_order_orm(db, order_id)
+        await cache.set(key, payload)
     
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Заказ с ID {order_id} не найден",
-        )
-    
-    return {
-        "id": order.id,
-        "client_id": order.client_id,
-        "created_at": order.created_at,
-        "items": [
-            {
-                "id": item.id,
-                "product_id": item.product_id,
-                "quantity": item.quantity,
-                "price": str(item.price),
-            }
-            for item in order.items
-        ],
-    }
-
+    return ModelResponse(payload)
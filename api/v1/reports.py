@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.db import get_read_db
+from api.schemas import TopProductResponse
+from api.services import get_top_products
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get(
+    "/top-products",
+    response_model=list[TopProductResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Самые продаваемые товары",
+    description="""
+    Товары с наибольшим числом проданных единиц за последние `days` дней
+    (по дате заказа, UTC) с названием корневой категории. Считается по
+    дневным итогам продаж (`product_sales_daily`) и еще не перенесенному
+    в них журналу, без сканирования позиций заказов.
+    """,
+)
+async def top_products(
+    days: int = Query(30, ge=1, le=366, description="Размер окна в днях"),
+    limit: int = Query(5, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[TopProductResponse]:
+    """
+    Получает топ товаров за скользящее окно.
+
+    Args:
+        days: Размер окна в днях, включая сегодня
+        limit: Сколько товаров вернуть
+        db: Сессия базы данных
+
+    Returns:
+        list[TopProductResponse]: Товары по убыванию проданного количества
+    """
+    return await get_top_products(db, days, limit)
@@ -0,0 +1,3 @@
+"""
+Бенчмарки производительности AITI Guru Test API
+"""
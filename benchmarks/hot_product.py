@@ -0,0 +1,110 @@
+"""
+Бенчмарк списания остатков одного "горячего" товара.
+
+Сравнивает пропускную способность:
+- direct - каждый запрос выполняет свой условный UPDATE в отдельной транзакции
+  (так списывает остаток режим ADD_ITEM_MODE="atomic");
+- coalesced - запросы объединяются движком StockReservationEngine.
+
+Запуск (нужна БД с применёнными миграциями):
+    python -m benchmarks.hot_product --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from api.core.config import settings
+from api.models import Product
+from api.services import StockReservationEngine
+
+
+async def run_direct(session_factory, product_id: int, requests: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reserve() -> None:
+        async with semaphore, session_factory() as session:
+            await session.execute(
+                update(Product)
+                .where(Product.id == product_id, Product.quantity >= 1)
+                .values(quantity=Product.quantity - 1)
+            )
+            await session.commit()
+
+    await asyncio.gather(*(reserve() for _ in range(requests)))
+
+
+async def run_coalesced(
+    session_factory,
+    product_id: int,
+    requests: int,
+    concurrency: int,
+    flush_interval: float,
+    max_batch_size: int,
+) -> None:
+    reservations = StockReservationEngine(
+        session_factory, flush_interval=flush_interval, max_batch_size=max_batch_size
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reserve() -> None:
+        async with semaphore:
+            await reservations.reserve(product_id, 1)
+
+    await asyncio.gather(*(reserve() for _ in range(requests)))
+    await reservations.stop()
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        args.dsn, pool_size=min(args.concurrency, 50), max_overflow=0
+    )
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        product_id = await session.scalar(
+            insert(Product)
+            .values(name="benchmark-hot-product", quantity=args.requests * 2, price=1)
+            .returning(Product.id)
+        )
+        await session.commit()
+
+    try:
+        for mode in args.modes:
+            started = time.perf_counter()
+            if mode == "direct":
+                await run_direct(session_factory, product_id, args.requests, args.concurrency)
+            else:
+                await run_coalesced(
+                    session_factory,
+                    product_id,
+                    args.requests,
+                    args.concurrency,
+                    args.flush_interval,
+                    args.max_batch_size,
+                )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:>10}: {args.requests} reservations in {elapsed:.2f}s "
+                f"({args.requests / elapsed:,.0f} req/s)"
+            )
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(Product).where(Product.id == product_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.database_url)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--flush-interval", type=float, default=settings.STOCK_FLUSH_INTERVAL)
+    parser.add_argument("--max-batch-size", type=int, default=settings.STOCK_FLUSH_MAX_BATCH)
+    parser.add_argument(
+        "--modes", nargs="+", choices=["direct", "coalesced"], default=["direct", "coalesced"]
+    )
+    asyncio.run(main(parser.parse_args()))
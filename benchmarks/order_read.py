@@ -0,0 +1,107 @@
+"""
+Бенчмарк чтения заказа: ORM (selectinload) против JSON, собранного в PostgreSQL.
+
+Для заказов разного размера измеряет время и процессорное время Python
+на один запрос, а также объем выделенной памяти (tracemalloc).
+
+Запуск (нужна БД с применёнными миграциями):
+    python -m benchmarks.order_read --sizes 1 100 1000 --reads 200
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from api.core.config import settings
+from api.models import Client, Order, OrderItem, Product
+from api.services import load_order_json, load_order_orm
+
+LOADERS = {"orm": load_order_orm, "json": load_order_json}
+
+
+async def seed_order(session_factory, size: int) -> tuple[int, int, list[int]]:
+    """Создает клиента, заказ и `size` позиций по разным товарам"""
+    async with session_factory() as session:
+        client_id = await session.scalar(
+            insert(Client).values(name="benchmark-client").returning(Client.id)
+        )
+        order_id, created_at = (await session.execute(
+            insert(Order).values(client_id=client_id).returning(Order.id, Order.created_at)
+        )).one()
+        product_ids = list(await session.scalars(
+            insert(Product).returning(Product.id),
+            [{"name": f"benchmark-{i}", "quantity": 0, "price": 10 + i} for i in range(size)],
+        ))
+        await session.execute(insert(OrderItem), [
+            {
+                "order_id": order_id,
+                "order_created_at": created_at,
+                "product_id": product_id,
+                "quantity": 1,
+                "price": 10,
+            }
+            for product_id in product_ids
+        ])
+        await session.commit()
+    return client_id, order_id, product_ids
+
+
+async def cleanup(session_factory, client_id: int, order_id: int, product_ids: list[int]) -> None:
+    async with session_factory() as session:
+        await session.execute(delete(OrderItem).where(OrderItem.order_id == order_id))
+        await session.execute(delete(Order).where(Order.id == order_id))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+        await session.execute(delete(Client).where(Client.id == client_id))
+        await session.commit()
+
+
+async def measure(session_factory, loader, order_id: int, reads: int) -> dict:
+    tracemalloc.start()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    for _ in range(reads):
+        # Новая сессия на каждый запрос - как в get_db
+        async with session_factory() as session:
+            await loader(session, order_id)
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ms_per_read": elapsed / reads * 1000,
+        "cpu_ms_per_read": cpu / reads * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.dsn)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'items':>6} {'mode':>5} {'ms/read':>9} {'cpu ms/read':>12} {'peak KiB':>10}")
+    try:
+        for size in args.sizes:
+            client_id, order_id, product_ids = await seed_order(session_factory, size)
+            try:
+                for mode in args.modes:
+                    # Прогрев: кэш подготовленных выражений и компиляции запросов
+                    await measure(session_factory, LOADERS[mode], order_id, 3)
+                    result = await measure(session_factory, LOADERS[mode], order_id, args.reads)
+                    print(
+                        f"{size:>6} {mode:>5} {result['ms_per_read']:>9.2f} "
+                        f"{result['cpu_ms_per_read']:>12.2f} {result['peak_kib']:>10.0f}"
+                    )
+            finally:
+                await cleanup(session_factory, client_id, order_id, product_ids)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=settings.database_url)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 100, 1000])
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--modes", nargs="+", choices=list(LOADERS), default=list(LOADERS))
+    asyncio.run(main(parser.parse_args()))
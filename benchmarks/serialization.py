@@ -0,0 +1,115 @@
+"""
+Микробенчмарк сериализации ответа GET /orders/{order_id}, без БД.
+
+Для заказов из 1, 100 и 1000 позиций сравнивает способы получить JSON-байты:
+- fastapi  - путь FastAPI по умолчанию: повторная валидация по response_model,
+             dump_python(mode="json") и json.dumps в JSONResponse
+- dict     - прежний вариант: dict, собранный вручную, и json.dumps
+- model    - OrderResponse.model_dump_json()
+- adapter  - TypeAdapter.dump_json (ModelResponse)
+
+Запуск:
+    python -m benchmarks.serialization --sizes 1 100 1000 --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from api.core.responses import dump_json
+from api.schemas import OrderItemResponse, OrderResponse
+
+order_adapter = TypeAdapter(OrderResponse)
+
+
+def build_order(size: int) -> OrderResponse:
+    """Заказ с `size` позициями по разным товарам"""
+    return OrderResponse(
+        id=1,
+        client_id=1,
+        created_at=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+        items=[
+            OrderItemResponse(
+                id=index + 1,
+                order_id=1,
+                product_id=index + 1,
+                quantity=1 + index % 5,
+                price=Decimal("1299.99") + index,
+            )
+            for index in range(size)
+        ],
+    )
+
+
+def encode_fastapi(order: OrderResponse) -> bytes:
+    value = order_adapter.validate_python(order, from_attributes=True)
+    content = jsonable_encoder(order_adapter.dump_python(value, mode="json"))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_dict(order: OrderResponse) -> bytes:
+    content = {
+        "id": order.id,
+        "client_id": order.client_id,
+        "created_at": order.created_at.isoformat(),
+        "items": [
+            {
+                "id": item.id,
+                "order_id": item.order_id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price": str(item.price),
+            }
+            for item in order.items
+        ],
+    }
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def encode_model(order: OrderResponse) -> bytes:
+    return order.model_dump_json().encode("utf-8")
+
+
+def encode_adapter(order: OrderResponse) -> bytes:
+    return dump_json(order)
+
+
+ENCODERS = {
+    "fastapi": encode_fastapi,
+    "dict": encode_dict,
+    "model": encode_model,
+    "adapter": encode_adapter,
+}
+
+
+def measure(encoder, order: OrderResponse, repeat: int) -> float:
+    """Среднее время одной сериализации, мкс"""
+    encoder(order)  # прогрев
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encoder(order)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"{'items':>6} {'encoder':>8} {'us/op':>10} {'bytes':>8}")
+    for size in args.sizes:
+        order = build_order(size)
+        for name in args.encoders:
+            encoder = ENCODERS[name]
+            elapsed = measure(encoder, order, args.repeat)
+            print(f"{size:>6} {name:>8} {elapsed:>10.1f} {len(encoder(order)):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--encoders", nargs="+", choices=list(ENCODERS), default=list(ENCODERS))
+    main(parser.parse_args())
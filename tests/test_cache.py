@@ -0,0 +1,128 @@
+import pytest
+from httpx import AsyncClient
+
+from api.cache import InMemoryLRUCache, RedisCache
+
+
+class FakeRedis:
+    """Локальная замена redis.asyncio.Redis для тестов"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+    
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+class TestInMemoryLRUCache:
+    """Тесты LRU-кэша в памяти"""
+    
+    @pytest.mark.asyncio
+    async def test_eviction(self):
+        """При превышении размера вытесняется давно не использованная запись"""
+        cache = InMemoryLRUCache(ttl=60, max_size=2)
+        await cache.set("a", b"1")
+        await cache.set("b", b"2")
+        await cache.get("a")
+        await cache.set("c", b"3")
+        
+        assert await cache.get("b") is None
+        assert await cache.get("a") == b"1"
+        assert cache.stats.evictions == 1
+        assert cache.size == 2
+    
+    @pytest.mark.asyncio
+    async def test_expiration(self):
+        """Запись с истекшим TTL считается промахом"""
+        cache = InMemoryLRUCache(ttl=0, max_size=10)
+        await cache.set("a", b"1")
+        
+        assert await cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert cache.stats.misses == 1
+    
+    @pytest.mark.asyncio
+    async def test_delete(self):
+        """Инвалидация удаляет запись"""
+        cache = InMemoryLRUCache(ttl=60, max_size=10)
+        await cache.set("a", b"1")
+        await cache.delete("a", "missing")
+        
+        assert await cache.get("a") is None
+        assert cache.stats.invalidations == 1
+
+
+class TestRedisCache:
+    """Тесты Redis backend на локальной замене клиента"""
+    
+    @pytest.mark.asyncio
+    async def test_get_set_delete(self):
+        """Значения хранятся с префиксом, счетчики обновляются"""
+        redis = FakeRedis()
+        cache = RedisCache(redis, ttl=5)
+        
+        assert await cache.get("order:1") is None
+        await cache.set("order:1", b"{}")
+        assert redis.data == {"aiti:order:1": b"{}"}
+        assert await cache.get("order:1") == b"{}"
+        await cache.delete("order:1")
+        
+        assert redis.data == {}
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.invalidations) == (1, 1, 1)
+
+
+class TestOrderCache:
+    """Тесты кэширования GET /api/v1/orders/{order_id}"""
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit(self, client: AsyncClient, test_data, order_cache):
+        """Повторный запрос обслуживается из кэша"""
+        first = await client.get("/api/v1/orders/1")
+        second = await client.get("/api/v1/orders/1")
+        
+        assert first.json() == second.json()
+        assert (order_cache.stats.misses, order_cache.stats.hits) == (1, 1)
+        
+        stats = (await client.get("/api/v1/admin/cache/orders")).json()
+        assert stats["backend"] == "memory"
+        assert stats["hit_ratio"] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_invalidated_by_add_item(self, client: AsyncClient, test_data):
+        """Добавление товара инвалидирует кэш заказа"""
+        await client.get("/api/v1/orders/1")
+        await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 2}
+        )
+        
+        response = await client.get("/api/v1/orders/1")
+        
+        assert response.json()["items"][0]["quantity"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalidated_by_add_items(self, client: AsyncClient, test_data):
+        """Пакетное добавление инвалидирует кэш затронутых заказов"""
+        await client.get("/api/v1/orders/1")
+        await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [{"order_id": 1, "product_id": 1, "quantity": 3}]}
+        )
+        
+        response = await client.get("/api/v1/orders/1")
+        
+        assert response.json()["items"][0]["quantity"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_not_found_not_cached(self, client: AsyncClient, test_data, order_cache):
+        """Ответ 404 не кэшируется"""
+        response = await client.get("/api/v1/orders/999")
+        
+        assert response.status_code == 404
+        assert order_cache.size == 0
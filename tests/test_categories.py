@@ -0,0 +1,266 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models import Category, Product
+from api.services import CategoryTree, CategoryTreeIndex
+
+
+@pytest_asyncio.fixture
+async def tree(db_session: AsyncSession):
+    """
+    Дерево категорий:
+        1 Электроника ─ 2 Ноутбуки ─ 3 Игровые
+        4 Бытовая техника
+    """
+    db_session.add_all([
+        Category(id=1, name="Электроника"),
+        Category(id=4, name="Бытовая техника"),
+    ])
+    await db_session.flush()
+    db_session.add(Category(id=2, name="Ноутбуки", parent_id=1))
+    await db_session.flush()
+    db_session.add(Category(id=3, name="Игровые", parent_id=2))
+    # id заданы явно - сдвигаем последовательность для новых категорий
+    await db_session.execute(text("SELECT setval('categories_id_seq', 4)"))
+    await db_session.commit()
+
+
+async def tree_columns(db: AsyncSession) -> dict[int, tuple]:
+    rows = await db.execute(
+        select(Category.id, Category.root_category_id, Category.depth, Category.path)
+        .order_by(Category.id)
+    )
+    return {row.id: (row.root_category_id, row.depth, row.path) for row in rows}
+
+
+class TestCategoryTree:
+    """Тесты материализованного корня и пути категорий"""
+
+    @pytest.mark.asyncio
+    async def test_insert_fills_tree_columns(self, db_session: AsyncSession, tree):
+        """При вставке заполняются корень, глубина и путь"""
+        assert await tree_columns(db_session) == {
+            1: (1, 0, "/1/"),
+            2: (1, 1, "/1/2/"),
+            3: (1, 2, "/1/2/3/"),
+            4: (4, 0, "/4/"),
+        }
+
+    @pytest.mark.asyncio
+    async def test_orm_receives_tree_columns(self, db_session: AsyncSession, tree):
+        """ORM получает вычисленные столбцы сразу после вставки (RETURNING)"""
+        category = Category(id=5, name="Планшеты", parent_id=1)
+        db_session.add(category)
+        await db_session.flush()
+
+        assert category.root_category_id == 1
+        assert category.depth == 1
+        assert category.path == "/1/5/"
+
+    @pytest.mark.asyncio
+    async def test_move_subtree(self, db_session: AsyncSession, tree):
+        """Перенос категории пересчитывает все ее поддерево"""
+        await db_session.execute(update(Category).where(Category.id == 2).values(parent_id=4))
+        await db_session.commit()
+
+        columns = await tree_columns(db_session)
+        assert columns[2] == (4, 1, "/4/2/")
+        assert columns[3] == (4, 2, "/4/2/3/")
+
+    @pytest.mark.asyncio
+    async def test_subtree_becomes_root(self, db_session: AsyncSession, tree):
+        """Категория без родителя становится корнем своего поддерева"""
+        await db_session.execute(update(Category).where(Category.id == 2).values(parent_id=None))
+        await db_session.commit()
+
+        columns = await tree_columns(db_session)
+        assert columns[2] == (2, 0, "/2/")
+        assert columns[3] == (2, 1, "/2/3/")
+
+    @pytest.mark.asyncio
+    async def test_move_into_own_subtree_rejected(self, db_session: AsyncSession, tree):
+        """Категорию нельзя перенести в ее собственное поддерево"""
+        with pytest.raises(IntegrityError):
+            await db_session.execute(
+                update(Category).where(Category.id == 1).values(parent_id=3)
+            )
+
+    @pytest.mark.asyncio
+    async def test_products_by_root_category(self, db_session: AsyncSession, tree):
+        """Товары по корневой категории - обычный join без рекурсии"""
+        db_session.add_all([
+            Product(name="Ноутбук", quantity=1, price=100, category_id=2),
+            Product(name="Игровой ноутбук", quantity=1, price=200, category_id=3),
+            Product(name="Холодильник", quantity=1, price=300, category_id=4),
+        ])
+        await db_session.commit()
+
+        rows = await db_session.execute(
+            select(Category.root_category_id, func.count(Product.id))
+            .join(Product, Product.category_id == Category.id)
+            .group_by(Category.root_category_id)
+            .order_by(Category.root_category_id)
+        )
+
+        assert rows.all() == [(1, 2), (4, 1)]
+
+
+class TestCategoryTreeSnapshot:
+    """Тесты снимка дерева категорий на массивах"""
+
+    @pytest.fixture
+    def snapshot(self) -> CategoryTree:
+        return CategoryTree([
+            (1, None, "Электроника"),
+            (2, 1, "Ноутбуки"),
+            (3, 2, "Игровые"),
+            (5, 1, "Аудио"),
+            (4, None, "Бытовая техника"),
+            (6, 99, "Без родителя"),
+        ])
+
+    def test_preorder(self, snapshot: CategoryTree):
+        """Категории упорядочены обходом в глубину, соседи - по названию"""
+        assert list(snapshot.ids) == [6, 4, 1, 5, 2, 3]
+
+    def test_root_and_depth(self, snapshot: CategoryTree):
+        """Корень и глубина считаются при построении"""
+        assert snapshot.root_id(3) == 1
+        assert snapshot.root_id(4) == 4
+        assert snapshot.node(3).depth == 2
+        assert snapshot.node(6).parent_id is None
+
+    def test_is_ancestor(self, snapshot: CategoryTree):
+        """Проверка предка по интервалам обхода"""
+        assert snapshot.is_ancestor(1, 3)
+        assert snapshot.is_ancestor(3, 3)
+        assert not snapshot.is_ancestor(3, 1)
+        assert not snapshot.is_ancestor(5, 3)
+        assert not snapshot.is_ancestor(4, 3)
+
+    def test_subtree_and_relatives(self, snapshot: CategoryTree):
+        """Поддерево, предки и прямые потомки"""
+        assert sorted(snapshot.subtree_ids(1)) == [1, 2, 3, 5]
+        assert list(snapshot.subtree_ids(3)) == [3]
+        assert [node.id for node in snapshot.ancestors(3)] == [1, 2]
+        assert [node.id for node in snapshot.children(1)] == [5, 2]
+
+
+class TestCategoryTreeIndex:
+    """Тесты индекса дерева категорий"""
+
+    @pytest.mark.asyncio
+    async def test_reload_on_notify(
+        self, db_session: AsyncSession, tree, engine, category_index: CategoryTreeIndex
+    ):
+        """Изменение категорий в БД перестраивает индекс по NOTIFY"""
+        assert 10 not in await category_index.get()
+        await category_index.listen(engine)
+
+        async with engine.begin() as conn:
+            await conn.execute(insert(Category).values(id=10, name="Планшеты", parent_id=1))
+
+        for _ in range(100):
+            if 10 in await category_index.get():
+                break
+            await asyncio.sleep(0.02)
+        tree_snapshot = await category_index.get()
+        assert 10 in tree_snapshot
+        assert tree_snapshot.is_ancestor(1, 10)
+
+
+class TestCategoriesAPI:
+    """Тесты API категорий"""
+
+    @pytest.mark.asyncio
+    async def test_list_categories(self, client: AsyncClient, tree):
+        """Категории отдаются в порядке обхода дерева"""
+        response = await client.get("/api/v1/categories")
+
+        assert response.status_code == 200
+        assert [category["id"] for category in response.json()] == [4, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_get_category(self, client: AsyncClient, tree):
+        """Категория с путем от корня и потомками"""
+        response = await client.get("/api/v1/categories/2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["root_category_id"] == 1
+        assert [category["id"] for category in data["ancestors"]] == [1]
+        assert [category["id"] for category in data["children"]] == [3]
+        assert data["subtree_size"] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_category_not_found(self, client: AsyncClient, tree):
+        """Несуществующая категория - 404"""
+        response = await client.get("/api/v1/categories/999")
+
+        assert response.status_code == 404
+        assert "не найдена" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_subtree_products(self, client: AsyncClient, db_session: AsyncSession, tree):
+        """Товары категории вместе с подкатегориями"""
+        db_session.add_all([
+            Product(id=1, name="Ноутбук", quantity=1, price=100, category_id=2),
+            Product(id=2, name="Игровой ноутбук", quantity=1, price=200, category_id=3),
+            Product(id=3, name="Холодильник", quantity=1, price=300, category_id=4),
+        ])
+        await db_session.commit()
+
+        response = await client.get("/api/v1/categories/1/products")
+        assert response.status_code == 200
+        assert [product["id"] for product in response.json()] == [1, 2]
+
+        response = await client.get("/api/v1/categories/1/products", params={"limit": 1, "offset": 1})
+        assert [product["id"] for product in response.json()] == [2]
+
+    @pytest.mark.asyncio
+    async def test_create_and_move_category(self, client: AsyncClient, tree):
+        """Созданная и перенесенная категория сразу видна в индексе"""
+        response = await client.post(
+            "/api/v1/categories", json={"name": "Планшеты", "parent_id": 1}
+        )
+        assert response.status_code == 201
+        created = response.json()
+        assert (created["root_category_id"], created["depth"]) == (1, 1)
+
+        response = await client.patch(f"/api/v1/categories/{created['id']}", json={"parent_id": 4})
+        assert response.status_code == 200
+        assert response.json()["root_category_id"] == 4
+
+        response = await client.get("/api/v1/categories/4")
+        assert [category["id"] for category in response.json()["children"]] == [created["id"]]
+
+    @pytest.mark.asyncio
+    async def test_move_into_subtree_conflict(self, client: AsyncClient, tree):
+        """Перенос категории в ее поддерево - 409"""
+        response = await client.patch("/api/v1/categories/1", json={"parent_id": 3})
+
+        assert response.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_create_with_missing_parent(self, client: AsyncClient, tree):
+        """Несуществующий родитель - 404"""
+        response = await client.post(
+            "/api/v1/categories", json={"name": "Планшеты", "parent_id": 999}
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_duplicate_name_conflict(self, client: AsyncClient, tree):
+        """Повтор названия у того же родителя - 409"""
+        response = await client.post(
+            "/api/v1/categories", json={"name": "Ноутбуки", "parent_id": 1}
+        )
+
+        assert response.status_code == 409
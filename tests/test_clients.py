@@ -0,0 +1,234 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.models import Client, ClientTotals, Order, OrderItem, Product
+from api.schemas import AddItemToOrderRequest
+from api.services import ClientTotalsReconciler, add_item_atomic
+
+
+@pytest_asyncio.fixture
+async def clients(db_session: AsyncSession, test_data):
+    """
+    К данным test_data добавляются клиенты 2 (заказ 2) и 3 (без заказов)
+    и товар 3 (цена 10). Возвращает заказы по id.
+    """
+    db_session.add_all([
+        Client(id=2, name="Второй клиент"),
+        Client(id=3, name="Клиент без заказов"),
+        Product(id=3, name="Товар В", quantity=100, price=10, category_id=1),
+    ])
+    await db_session.flush()
+    order = Order(id=2, client_id=2)
+    db_session.add(order)
+    await db_session.commit()
+    return {1: test_data["order"], 2: order}
+
+
+def item(order: Order, product_id: int, quantity: int, price: int) -> OrderItem:
+    """Позиция заказа (дата заказа - ключ секционирования order_items)"""
+    return OrderItem(
+        order_id=order.id,
+        order_created_at=order.created_at,
+        product_id=product_id,
+        quantity=quantity,
+        price=price,
+    )
+
+
+async def stored_totals(db: AsyncSession) -> dict:
+    orders = await db.execute(select(Order.id, Order.total_quantity, Order.total_amount))
+    clients = await db.execute(
+        select(
+            ClientTotals.client_id,
+            ClientTotals.orders_count,
+            ClientTotals.total_quantity,
+            ClientTotals.total_amount,
+        )
+    )
+    return {
+        "orders": {row.id: (row.total_quantity, row.total_amount) for row in orders},
+        "clients": {row.client_id: tuple(row[1:]) for row in clients},
+    }
+
+
+class TestTotalsMaintenance:
+    """Тесты поддержки итогов заказов и клиентов"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["atomic", "orm", "coalesced", "sharded"])
+    async def test_add_item_updates_totals(
+        self, client: AsyncClient, db_session: AsyncSession, clients, monkeypatch, mode
+    ):
+        """Добавление товара в любом режиме обновляет итоги заказа и клиента"""
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", mode)
+        for quantity in (2, 3):
+            response = await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": 1, "product_id": 1, "quantity": quantity},
+            )
+            assert response.status_code == 200
+
+        totals = await stored_totals(db_session)
+        assert totals["orders"][1] == (5, Decimal("5000.00"))
+        assert totals["clients"][1] == (1, 5, Decimal("5000.00"))
+        assert totals["clients"][2] == (1, 0, Decimal("0.00"))
+
+    @pytest.mark.asyncio
+    async def test_batch_across_clients(
+        self, client: AsyncClient, db_session: AsyncSession, clients
+    ):
+        """Пакет позиций в заказы разных клиентов"""
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [
+                {"order_id": 2, "product_id": 3, "quantity": 4},
+                {"order_id": 1, "product_id": 1, "quantity": 1},
+                {"order_id": 1, "product_id": 3, "quantity": 2},
+            ]},
+        )
+        assert response.status_code == 200
+
+        totals = await stored_totals(db_session)
+        assert totals["orders"] == {1: (3, Decimal("1020.00")), 2: (4, Decimal("40.00"))}
+        assert totals["clients"][1] == (1, 3, Decimal("1020.00"))
+        assert totals["clients"][2] == (1, 4, Decimal("40.00"))
+
+    @pytest.mark.asyncio
+    async def test_delete_and_move(self, db_session: AsyncSession, clients):
+        """Удаление позиций и заказов, перенос заказа другому клиенту"""
+        db_session.add_all([
+            item(clients[1], 3, 5, 10),
+            item(clients[2], 3, 1, 10),
+        ])
+        await db_session.commit()
+
+        await db_session.execute(update(Order).where(Order.id == 1).values(client_id=2))
+        await db_session.commit()
+        totals = await stored_totals(db_session)
+        assert totals["clients"][1] == (0, 0, Decimal("0.00"))
+        assert totals["clients"][2] == (2, 6, Decimal("60.00"))
+
+        await db_session.execute(delete(OrderItem).where(OrderItem.order_id == 1))
+        await db_session.execute(delete(Order).where(Order.id == 1))
+        await db_session.commit()
+        totals = await stored_totals(db_session)
+        assert totals["clients"][2] == (1, 1, Decimal("10.00"))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_add_item(self, engine, clients):
+        """Параллельные добавления в один заказ не теряют обновления итогов"""
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def add_item(product_id: int):
+            async with session_factory() as session:
+                await add_item_atomic(
+                    session, AddItemToOrderRequest(order_id=1, product_id=product_id, quantity=1)
+                )
+
+        await asyncio.gather(*(add_item(product_id) for product_id in [1, 3] * 5))
+
+        async with session_factory() as session:
+            totals = await stored_totals(session)
+        assert totals["orders"][1] == (10, Decimal("5050.00"))
+        assert totals["clients"][1] == (1, 10, Decimal("5050.00"))
+
+
+class TestClientTotalsAPI:
+    """Тесты эндпоинтов /api/v1/clients"""
+
+    @pytest.mark.asyncio
+    async def test_client_totals(self, client: AsyncClient, db_session: AsyncSession, clients):
+        """Итоги клиента и список по убыванию суммы"""
+        db_session.add_all([
+            item(clients[1], 3, 1, 10),
+            item(clients[2], 3, 5, 10),
+        ])
+        await db_session.commit()
+
+        response = await client.get("/api/v1/clients/2/totals")
+        assert response.status_code == 200
+        assert response.json() == {
+            "client_id": 2,
+            "client_name": "Второй клиент",
+            "orders_count": 1,
+            "total_quantity": 5,
+            "total_amount": "50.00",
+        }
+
+        response = await client.get("/api/v1/clients/3/totals")
+        assert response.json()["orders_count"] == 0
+        assert response.json()["total_amount"] == "0.00"
+
+        response = await client.get("/api/v1/clients/totals")
+        assert [row["client_id"] for row in response.json()] == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_client_not_found(self, client: AsyncClient, clients):
+        """Несуществующий клиент - 404"""
+        response = await client.get("/api/v1/clients/999/totals")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["json", "orm"])
+    async def test_order_includes_totals(
+        self, client: AsyncClient, test_data, monkeypatch, mode
+    ):
+        """Заказ отдается с итогами без суммирования позиций"""
+        monkeypatch.setattr(settings, "ORDER_READ_MODE", mode)
+        await client.post(
+            "/api/v1/orders/add-item", json={"order_id": 1, "product_id": 1, "quantity": 2}
+        )
+
+        data = (await client.get("/api/v1/orders/1")).json()
+
+        assert data["total_quantity"] == 2
+        assert data["total_amount"] == "2000.00"
+
+
+class TestReconciliation:
+    """Тесты сверки итогов"""
+
+    @pytest.mark.asyncio
+    async def test_reconcile_and_fix(
+        self, client: AsyncClient, db_session: AsyncSession, clients, reconciler: ClientTotalsReconciler
+    ):
+        """Сверка находит расхождения по частям и исправляет их"""
+        db_session.add(item(clients[2], 3, 5, 10))
+        await db_session.commit()
+
+        # Портим итоги в обход триггеров
+        await db_session.execute(text("ALTER TABLE orders DISABLE TRIGGER orders_client_totals_update"))
+        await db_session.execute(update(Order).where(Order.id == 2).values(total_quantity=1))
+        await db_session.execute(text("ALTER TABLE orders ENABLE TRIGGER orders_client_totals_update"))
+        await db_session.execute(
+            update(ClientTotals).where(ClientTotals.client_id == 1).values(total_amount=99)
+        )
+        await db_session.commit()
+
+        response = await client.post("/api/v1/admin/client-totals/reconcile")
+        assert response.status_code == 200
+        report = response.json()
+        assert report["chunks"] == 2
+        assert report["fixed"] is False
+        assert [(row["order_id"], row["total_quantity"], row["expected_total_quantity"])
+                for row in report["orders"]] == [(2, 1, 5)]
+        assert [(row["client_id"], row["total_amount"], row["expected_total_amount"])
+                for row in report["clients"]] == [(1, "99.00", "0.00")]
+
+        response = await client.post("/api/v1/admin/client-totals/reconcile", params={"fix": True})
+        assert response.json()["fixed"] is True
+
+        report = await reconciler.run()
+        assert report.clients == [] and report.orders == []
+        totals = await stored_totals(db_session)
+        assert totals["orders"][2] == (5, Decimal("50.00"))
+        assert totals["clients"][1] == (1, 0, Decimal("0.00"))
+        assert totals["clients"][2] == (1, 5, Decimal("50.00"))
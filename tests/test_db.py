@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+
+from api.db import MeteredQueuePool, create_engine
+
+
+@pytest.fixture
+def dsn(engine):
+    """URL тестовой БД"""
+    return engine.url.render_as_string(hide_password=False)
+
+
+class TestCreateEngine:
+    """Тесты настройки движка и пула соединений"""
+
+    @pytest.mark.asyncio
+    async def test_pool_settings(self, dsn):
+        """Параметры пула и statement_timeout применяются"""
+        engine = create_engine(
+            dsn, pool_size=3, max_overflow=1, pool_timeout=5, statement_timeout=1500
+        )
+        try:
+            assert isinstance(engine.pool, MeteredQueuePool)
+            assert engine.pool.size() == 3
+            async with engine.connect() as conn:
+                assert await conn.scalar(text("SHOW statement_timeout")) == "1500ms"
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_statement_timeout_cancels_query(self, dsn):
+        """Запрос дольше statement_timeout отменяется сервером"""
+        engine = create_engine(dsn, statement_timeout=100)
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(exc.DBAPIError):
+                    await conn.execute(text("SELECT pg_sleep(1)"))
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pgbouncer_mode(self, dsn):
+        """В режиме PgBouncer запросы выполняются без кэша выражений"""
+        engine = create_engine(dsn, pgbouncer=True)
+        try:
+            async with engine.connect() as conn:
+                for value in range(3):
+                    result = await conn.scalar(text("SELECT CAST(:value AS integer)"), {"value": value})
+                    assert result == value
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_checkout_metrics(self, dsn):
+        """Выдачи соединений и таймауты ожидания учитываются"""
+        engine = create_engine(dsn, pool_size=1, max_overflow=0, pool_timeout=0.2)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+            metrics = engine.pool.metrics
+            assert metrics.checkouts == 2
+            assert metrics.timeouts == 1
+            assert metrics.wait_max >= metrics.wait_avg > 0
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_idle_pre_ping_replaces_dead_connection(self, dsn):
+        """После простоя мертвое соединение заменяется новым"""
+        engine = create_engine(dsn, pool_size=1, pre_ping="idle", pre_ping_idle=0.05)
+        try:
+            async with engine.connect() as conn:
+                first_pid = await conn.scalar(text("SELECT pg_backend_pid()"))
+            # Соединение только что возвращено в пул - без проверки
+            async with engine.connect() as conn:
+                assert await conn.scalar(text("SELECT pg_backend_pid()")) == first_pid
+            assert engine.pool.metrics.pings == 0
+
+            admin_engine = create_engine(dsn)
+            async with admin_engine.connect() as admin:
+                await admin.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": first_pid})
+            await admin_engine.dispose()
+            await asyncio.sleep(0.1)
+
+            async with engine.connect() as conn:
+                assert await conn.scalar(text("SELECT pg_backend_pid()")) != first_pid
+            assert engine.pool.metrics.pings == 1
+            assert engine.pool.metrics.reconnects == 1
+        finally:
+            await engine.dispose()
+
+
+class TestPoolStats:
+    """Тесты эндпоинта статистики пула"""
+
+    @pytest.mark.asyncio
+    async def test_get_pool_stats(self, client: AsyncClient):
+        """Статистика пула приложения доступна"""
+        response = await client.get("/api/v1/admin/db/pool")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["size"] > 0
+        assert {"checkouts", "timeouts", "wait_avg_ms", "wait_max_ms"} <= data.keys()
@@ -1,5 +1,15 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.cache import order_cache_key
+from api.core.config import settings
+from api.models import OrderItem, Product
+from api.schemas import AddItemToOrderRequest, OrderResponse
+from api.services import InsufficientStockError, add_item_atomic
 
 
 class TestAddItemToOrder:
@@ -131,6 +141,131 @@ class TestAddItemToOrder:
         assert response.status_code == 422
 
 
+class TestAddItemModes:
+    """Тесты режимов добавления товара (atomic / orm)"""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["atomic", "orm"])
+    async def test_stock_decreased(self, client: AsyncClient, test_data, db_session, monkeypatch, mode):
+        """Остаток на складе уменьшается в обоих режимах"""
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", mode)
+        
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 4}
+        )
+        
+        assert response.status_code == 200
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 6
+    
+    @pytest.mark.asyncio
+    async def test_insufficient_stock_keeps_quantity(self, client: AsyncClient, test_data, db_session):
+        """При нехватке товара остаток и позиции заказа не меняются"""
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 11}
+        )
+        
+        assert response.status_code == 422
+        assert response.json()["detail"].endswith("доступно: 10")
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 10
+        assert await db_session.scalar(select(OrderItem.id)) is None
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_no_oversell(self, engine, test_data):
+        """Параллельные запросы не продают больше, чем есть на складе"""
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        request = AddItemToOrderRequest(order_id=1, product_id=1, quantity=3)
+        
+        async def add_item():
+            async with session_factory() as session:
+                try:
+                    return await add_item_atomic(session, request)
+                except InsufficientStockError:
+                    return None
+        
+        results = await asyncio.gather(*(add_item() for _ in range(8)))
+        
+        assert sum(result is not None for result in results) == 3
+        async with session_factory() as session:
+            assert await session.scalar(select(Product.quantity).where(Product.id == 1)) == 1
+            assert await session.scalar(select(OrderItem.quantity)) == 9
+
+
+class TestAddItems:
+    """Тесты эндпоинта POST /api/v1/orders/add-items"""
+    
+    @pytest.mark.asyncio
+    async def test_add_items_success(self, client: AsyncClient, test_data, db_session):
+        """Повторяющиеся позиции суммируются в одну строку заказа"""
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [
+                {"order_id": 1, "product_id": 1, "quantity": 2},
+                {"order_id": 1, "product_id": 1, "quantity": 3},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["applied"] is True
+        assert [result["status_code"] for result in data["results"]] == [200, 200]
+        assert data["results"][1]["item"]["quantity"] == 5
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 5
+    
+    @pytest.mark.asyncio
+    async def test_add_items_all_or_nothing(self, client: AsyncClient, test_data, db_session):
+        """При ошибке в одной позиции ничего не сохраняется"""
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [
+                {"order_id": 1, "product_id": 1, "quantity": 2},
+                {"order_id": 1, "product_id": 2, "quantity": 1},
+                {"order_id": 999, "product_id": 1, "quantity": 1},
+            ]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["applied"] is False
+        assert [result["status_code"] for result in data["results"]] == [409, 422, 404]
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 10
+    
+    @pytest.mark.asyncio
+    async def test_add_items_best_effort(self, client: AsyncClient, test_data, db_session):
+        """В режиме best_effort сохраняются корректные позиции"""
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={
+                "items": [
+                    {"order_id": 1, "product_id": 1, "quantity": 8},
+                    {"order_id": 1, "product_id": 1, "quantity": 3},
+                    {"order_id": 1, "product_id": 999, "quantity": 1},
+                ],
+                "mode": "best_effort",
+            }
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["applied"] is True
+        assert [result["status_code"] for result in data["results"]] == [200, 422, 404]
+        assert data["results"][1]["detail"].endswith("доступно: 2")
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 2
+    
+    @pytest.mark.asyncio
+    async def test_add_items_empty(self, client: AsyncClient, test_data):
+        """Ошибка валидации для пустого списка позиций"""
+        response = await client.post("/api/v1/orders/add-items", json={"items": []})
+        
+        assert response.status_code == 422
+
+
 class TestGetOrder:
     """Тесты эндпоинта GET /api/v1/orders/{order_id}"""
     
@@ -166,8 +301,39 @@ class TestGetOrder:
         assert data["items"][0]["quantity"] == 2
     
     @pytest.mark.asyncio
-    async def test_get_order_not_found(self, client: AsyncClient, test_data):
+    async def test_get_order_read_modes_match(
+        self, client: AsyncClient, test_data, order_cache, monkeypatch
+    ):
+        """Режимы json и orm возвращают одинаковый заказ"""
+        await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [
+                {"order_id": 1, "product_id": 1, "quantity": 2},
+                {"order_id": 1, "product_id": 1, "quantity": 1},
+            ]}
+        )
+        
+        payloads = {}
+        for mode in ["json", "orm"]:
+            monkeypatch.setattr(settings, "ORDER_READ_MODE", mode)
+            await order_cache.delete(order_cache_key(1))
+            response = await client.get("/api/v1/orders/1")
+            assert response.status_code == 200
+            payloads[mode] = response.json()
+        
+        # created_at сравниваем как дату: PostgreSQL не дописывает нули в долях секунды
+        assert OrderResponse.model_validate(payloads["json"]) == OrderResponse.model_validate(
+            payloads["orm"]
+        )
+        assert payloads["json"]["items"][0]["price"] == "1000.00"
+        assert payloads["json"]["items"][0]["order_id"] == 1
+        assert OrderResponse.model_validate(payloads["json"]).items[0].quantity == 3
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["json", "orm"])
+    async def test_get_order_not_found(self, client: AsyncClient, test_data, monkeypatch, mode):
         """Ошибка 404 если заказ не существует"""
+        monkeypatch.setattr(settings, "ORDER_READ_MODE", mode)
         response = await client.get("/api/v1/orders/999")
         
         assert response.status_code == 404
@@ -0,0 +1,112 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.models import ClientTotals, Order
+from api.services import OrderPartitionManager
+
+ARCHIVE_SCHEMA = "archive_test"
+
+
+@pytest_asyncio.fixture
+async def partitions(engine, db_session: AsyncSession):
+    """Менеджер секций тестовой БД: секции на месяц вперед, без архивирования"""
+    manager = OrderPartitionManager(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        months_ahead=1,
+        retention_months=0,
+        archive_schema=ARCHIVE_SCHEMA,
+        interval=60,
+    )
+    yield manager
+    await db_session.rollback()
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {ARCHIVE_SCHEMA} CASCADE"))
+
+
+async def partition_of(db: AsyncSession, table: str, key: str) -> list[str]:
+    rows = await db.execute(text(f"SELECT tableoid::regclass::text FROM {table} ORDER BY {key}"))
+    return list(rows.scalars())
+
+
+class TestOrderPartitions:
+    """Тесты месячных секций orders и order_items"""
+
+    @pytest.mark.asyncio
+    async def test_ensure_creates_months_ahead(self, partitions: OrderPartitionManager):
+        """Секции создаются с текущего месяца на months_ahead вперед, повторно - без ошибок"""
+        await partitions.ensure(today=date(2025, 12, 15))
+        await partitions.ensure(today=date(2025, 12, 20))
+
+        assert await partitions.partitions() == [date(2025, 12, 1), date(2026, 1, 1)]
+
+    @pytest.mark.asyncio
+    async def test_rows_routed_to_month(
+        self, client: AsyncClient, db_session: AsyncSession, test_data, partitions
+    ):
+        """Заказ и его позиции лежат в секциях своего месяца, остальное - в DEFAULT"""
+        await partitions.create_month(date(2025, 1, 1))
+        db_session.add(Order(id=2, client_id=1, created_at=datetime(2025, 1, 31, 23, 59)))
+        await db_session.commit()
+
+        for order_id in (1, 2):
+            response = await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": order_id, "product_id": 1, "quantity": 1},
+            )
+            assert response.status_code == 200
+
+        assert await partition_of(db_session, "orders", "id") == [
+            "orders_default", "orders_p2025_01",
+        ]
+        assert await partition_of(db_session, "order_items", "order_id") == [
+            "order_items_default", "order_items_p2025_01",
+        ]
+        response = await client.get("/api/v1/orders/2")
+        assert response.json()["total_quantity"] == 1
+
+    @pytest.mark.asyncio
+    async def test_archive_old_months(
+        self, client: AsyncClient, db_session: AsyncSession, test_data, partitions
+    ):
+        """Старые секции переносятся в архивную схему и выходят из итогов клиента"""
+        for month in (date(2025, 1, 1), date(2025, 2, 1)):
+            await partitions.create_month(month)
+        db_session.add_all([
+            Order(id=2, client_id=1, created_at=datetime(2025, 1, 10)),
+            Order(id=3, client_id=1, created_at=datetime(2025, 2, 10)),
+        ])
+        await db_session.commit()
+        for order_id, quantity in ((1, 1), (2, 2), (3, 3)):
+            await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": order_id, "product_id": 1, "quantity": quantity},
+            )
+
+        partitions.retention_months = 1
+        await partitions.ensure(today=date(2025, 3, 5))
+
+        assert await partitions.partitions() == [
+            date(2025, 2, 1), date(2025, 3, 1), date(2025, 4, 1),
+        ]
+        assert (await client.get("/api/v1/orders/2")).status_code == 404
+        archived = await db_session.execute(
+            text(f"SELECT id, total_quantity FROM {ARCHIVE_SCHEMA}.orders_p2025_01")
+        )
+        assert archived.all() == [(2, 2)]
+        archived_items = await db_session.scalar(
+            text(f"SELECT sum(quantity) FROM {ARCHIVE_SCHEMA}.order_items_p2025_01")
+        )
+        assert archived_items == 2
+
+        totals = (
+            await db_session.execute(
+                select(ClientTotals.orders_count, ClientTotals.total_quantity, ClientTotals.total_amount)
+            )
+        ).one()
+        assert totals == (2, 4, Decimal("4000.00"))
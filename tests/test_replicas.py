@@ -0,0 +1,120 @@
+import time
+
+import pytest
+import pytest_asyncio
+from fastapi import Request, Response
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from api.db import STICKY_COOKIE, ReplicaRouter, create_engine, get_read_db, get_replica_router
+from api.main import app
+
+
+def make_request(cookies: dict[str, str] | None = None) -> Request:
+    """Запрос Starlette с заданными cookie"""
+    cookie = "; ".join(f"{name}={value}" for name, value in (cookies or {}).items())
+    return Request({"type": "http", "headers": [(b"cookie", cookie.encode())]})
+
+
+@pytest_asyncio.fixture
+async def replicas(engine):
+    """Маршрутизатор с двумя "репликами" (отдельные пулы к тестовой БД)"""
+    dsn = engine.url.render_as_string(hide_password=False)
+    router = ReplicaRouter(
+        create_engine(dsn),
+        [create_engine(dsn), create_engine(dsn)],
+        sticky_seconds=5,
+    )
+    yield router
+    await router.dispose()
+    await router.primary.dispose()
+
+
+class TestReplicaRouter:
+    """Тесты выбора движка для чтения"""
+
+    def test_without_replicas_reads_primary(self, engine):
+        """Без реплик все чтения идут в primary"""
+        router = ReplicaRouter(engine, [])
+
+        assert router.read_engine(make_request()) is engine
+
+    def test_round_robin(self, replicas: ReplicaRouter):
+        """Чтения распределяются по репликам по кругу"""
+        picked = [replicas.read_engine(make_request()) for _ in range(4)]
+
+        assert picked == replicas.replicas * 2
+
+    @pytest.mark.asyncio
+    async def test_least_connections(self, replicas: ReplicaRouter):
+        """Выбирается реплика с наименьшим числом выданных соединений"""
+        replicas.strategy = "least_connections"
+        busy, idle = replicas.replicas
+
+        async with busy.connect():
+            assert replicas.read_engine(make_request()) is idle
+
+    def test_sticky_cookie_reads_primary(self, replicas: ReplicaRouter):
+        """После записи клиент читает из primary, пока не истечет окно"""
+        response = Response()
+        replicas.stick_to_primary(response)
+        cookie = response.headers["set-cookie"]
+        deadline = cookie.split(";")[0].split("=")[1]
+
+        assert cookie.startswith(STICKY_COOKIE)
+        assert replicas.read_engine(make_request({STICKY_COOKIE: deadline})) is replicas.primary
+        expired = make_request({STICKY_COOKIE: f"{time.time() - 1:.3f}"})
+        assert replicas.read_engine(expired) in replicas.replicas
+        assert replicas.read_engine(make_request({STICKY_COOKIE: "bad"})) in replicas.replicas
+
+    def test_no_sticky_cookie_without_replicas(self, engine):
+        """Без реплик cookie привязки не выставляется"""
+        response = Response()
+        ReplicaRouter(engine, []).stick_to_primary(response)
+
+        assert "set-cookie" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_read_session_bound_to_replica(self, replicas: ReplicaRouter):
+        """Сессия для чтения привязана к выбранной реплике"""
+        sessions = get_read_db(make_request(), replicas)
+        session = await anext(sessions)
+
+        assert session.bind.pool is replicas.replicas[0].pool
+        assert await session.scalar(text("SELECT 1")) == 1
+        await sessions.aclose()
+
+
+class TestStickyAfterWrite:
+    """Тесты привязки клиента к primary после записи"""
+
+    @pytest.mark.asyncio
+    async def test_add_item_sets_sticky_cookie(
+        self, client: AsyncClient, test_data, replicas: ReplicaRouter
+    ):
+        """Добавление товара привязывает чтения клиента к primary"""
+        app.dependency_overrides[get_replica_router] = lambda: replicas
+
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 1},
+        )
+
+        assert response.status_code == 200
+        assert float(response.cookies[STICKY_COOKIE]) > time.time()
+
+    @pytest.mark.asyncio
+    async def test_failed_bulk_add_is_not_sticky(
+        self, client: AsyncClient, test_data, replicas: ReplicaRouter
+    ):
+        """Неприменённый пакет не привязывает клиента к primary"""
+        app.dependency_overrides[get_replica_router] = lambda: replicas
+
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [{"order_id": 1, "product_id": 2, "quantity": 1}]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["applied"] is False
+        assert STICKY_COOKIE not in response.cookies
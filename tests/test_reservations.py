@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from api.core.config import settings
+from api.models import Product
+from api.services import InsufficientStockError, ProductNotFoundError, StockReservationEngine
+
+
+class TestStockReservationEngine:
+    """Тесты движка резервирования остатков"""
+    
+    @pytest.mark.asyncio
+    async def test_reserve_fifo(self, stock_reservations: StockReservationEngine, test_data):
+        """Параллельные списания удовлетворяются в порядке поступления"""
+        results = await asyncio.gather(
+            *(stock_reservations.reserve(1, quantity) for quantity in [4, 4, 3, 2, 1]),
+            return_exceptions=True,
+        )
+        
+        assert results[0] is None and results[1] is None
+        assert isinstance(results[2], InsufficientStockError)
+        assert results[2].detail.endswith("доступно: 2")
+        assert results[3] is None
+        assert isinstance(results[4], InsufficientStockError)
+        
+        async with stock_reservations.session_factory() as session:
+            assert await session.scalar(select(Product.quantity).where(Product.id == 1)) == 0
+    
+    @pytest.mark.asyncio
+    async def test_reserve_unknown_product(self, stock_reservations: StockReservationEngine, test_data):
+        """Списание несуществующего товара"""
+        with pytest.raises(ProductNotFoundError):
+            await stock_reservations.reserve(999, 1)
+    
+    @pytest.mark.asyncio
+    async def test_release(self, stock_reservations: StockReservationEngine, test_data):
+        """Компенсация возвращает остаток"""
+        await stock_reservations.reserve(1, 7)
+        await stock_reservations.release(1, 7)
+        
+        async with stock_reservations.session_factory() as session:
+            assert await session.scalar(select(Product.quantity).where(Product.id == 1)) == 10
+
+
+class TestAddItemCoalesced:
+    """Тесты POST /api/v1/orders/add-item в режиме coalesced"""
+    
+    @pytest.fixture(autouse=True)
+    def coalesced_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", "coalesced")
+    
+    @pytest.mark.asyncio
+    async def test_add_item_success(self, client: AsyncClient, test_data, db_session):
+        """Успешное добавление товара"""
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 2}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["quantity"] == 2
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 8
+    
+    @pytest.mark.asyncio
+    async def test_add_item_insufficient_stock(self, client: AsyncClient, test_data):
+        """Ошибка 422 сохраняется в режиме coalesced"""
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 2, "quantity": 1}
+        )
+        
+        assert response.status_code == 422
+        assert "недостаточно" in response.json()["detail"].lower()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("order_id, product_id", [(999, 1), (1, 999)])
+    async def test_add_item_not_found(self, client: AsyncClient, test_data, order_id, product_id):
+        """Ошибка 404 если заказ или товар не существует"""
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": order_id, "product_id": product_id, "quantity": 1}
+        )
+        
+        assert response.status_code == 404
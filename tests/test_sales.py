@@ -0,0 +1,180 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.models import OrderItem, Product, ProductSalesDaily, ProductSalesPending
+from api.services import SalesRollup
+
+
+@pytest_asyncio.fixture
+async def rollup(engine):
+    """Перенос журнала продаж, работающий с тестовой БД"""
+    return SalesRollup(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        interval=60,
+    )
+
+
+async def daily_totals(db: AsyncSession) -> dict[int, tuple[int, Decimal]]:
+    rows = await db.execute(
+        select(ProductSalesDaily.product_id, ProductSalesDaily.quantity, ProductSalesDaily.revenue)
+    )
+    return {row.product_id: (row.quantity, row.revenue) for row in rows}
+
+
+class TestSalesRollup:
+    """Тесты дневных итогов продаж"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["atomic", "orm", "coalesced", "sharded"])
+    async def test_add_item_logs_sales(
+        self, client: AsyncClient, db_session: AsyncSession, test_data, rollup, monkeypatch, mode
+    ):
+        """Добавление товара в любом режиме попадает в журнал и затем в итоги"""
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", mode)
+        for quantity in (2, 3):
+            response = await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": 1, "product_id": 1, "quantity": quantity},
+            )
+            assert response.status_code == 200
+
+        assert await db_session.scalar(select(func.sum(ProductSalesPending.quantity))) == 5
+
+        assert await rollup.flush() == 1
+        assert await daily_totals(db_session) == {1: (5, Decimal("5000.00"))}
+        assert await db_session.scalar(select(func.count()).select_from(ProductSalesPending)) == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_insert_one_log_row_per_product(
+        self, client: AsyncClient, db_session: AsyncSession, test_data
+    ):
+        """Пакетная вставка дает одну строку журнала на товар (триггер уровня выражения)"""
+        db_session.add(Product(id=3, name="Товар В", quantity=10, price=10, category_id=1))
+        await db_session.commit()
+
+        response = await client.post(
+            "/api/v1/orders/add-items",
+            json={"items": [
+                {"order_id": 1, "product_id": 1, "quantity": 1},
+                {"order_id": 1, "product_id": 3, "quantity": 2},
+                {"order_id": 1, "product_id": 1, "quantity": 1},
+            ]},
+        )
+        assert response.status_code == 200
+
+        rows = (
+            await db_session.execute(
+                select(ProductSalesPending.product_id, ProductSalesPending.quantity)
+                .order_by(ProductSalesPending.product_id)
+            )
+        ).all()
+        assert rows == [(1, 2), (3, 2)]
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_adjust_totals(
+        self, db_session: AsyncSession, test_data, rollup
+    ):
+        """Изменение и удаление позиций корректируют итоги"""
+        await db_session.execute(
+            insert(OrderItem).values(
+                order_id=1,
+                order_created_at=test_data["order"].created_at,
+                product_id=1,
+                quantity=5,
+                price=1000,
+            )
+        )
+        await db_session.execute(update(OrderItem).values(quantity=2))
+        await db_session.commit()
+        await rollup.flush()
+        assert await daily_totals(db_session) == {1: (2, Decimal("2000.00"))}
+
+        await db_session.execute(delete(OrderItem))
+        await db_session.commit()
+        await rollup.flush()
+        assert await daily_totals(db_session) == {1: (0, Decimal("0.00"))}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flush(self, db_session: AsyncSession, test_data, rollup):
+        """Параллельный перенос не учитывает строки журнала дважды"""
+        day = datetime.now(timezone.utc).date()
+        await db_session.execute(
+            insert(ProductSalesPending),
+            [{"product_id": 1, "day": day, "quantity": 1, "revenue": 10}] * 200,
+        )
+        await db_session.commit()
+
+        await asyncio.gather(*(rollup.flush() for _ in range(4)))
+
+        assert await daily_totals(db_session) == {1: (200, Decimal("2000.00"))}
+
+
+class TestTopProductsAPI:
+    """Тесты эндпоинта GET /api/v1/reports/top-products"""
+
+    @pytest.mark.asyncio
+    async def test_top_products(
+        self, client: AsyncClient, db_session: AsyncSession, test_data, rollup
+    ):
+        """Топ учитывает и итоги, и еще не перенесенный журнал"""
+        today = datetime.now(timezone.utc).date()
+        db_session.add(Product(id=3, name="Товар В", quantity=10, price=10, category_id=1))
+        await db_session.flush()
+        await db_session.execute(
+            insert(ProductSalesDaily),
+            [
+                {"product_id": 2, "day": today - timedelta(days=1), "quantity": 3, "revenue": 6000},
+                {"product_id": 3, "day": today - timedelta(days=2), "quantity": 1, "revenue": 10},
+                # За пределами окна в 30 дней
+                {"product_id": 3, "day": today - timedelta(days=30), "quantity": 100, "revenue": 1000},
+            ],
+        )
+        await db_session.commit()
+
+        response = await client.post(
+            "/api/v1/orders/add-item", json={"order_id": 1, "product_id": 1, "quantity": 4}
+        )
+        assert response.status_code == 200
+
+        expected = [
+            {
+                "product_id": 1,
+                "product_name": "Товар А",
+                "root_category_name": "Электроника",
+                "quantity": 4,
+                "revenue": "4000.00",
+            },
+            {
+                "product_id": 2,
+                "product_name": "Товар Б",
+                "root_category_name": "Электроника",
+                "quantity": 3,
+                "revenue": "6000.00",
+            },
+        ]
+        response = await client.get("/api/v1/reports/top-products", params={"limit": 2})
+        assert response.status_code == 200
+        assert response.json() == expected
+
+        # После переноса журнала результат тот же
+        await rollup.flush()
+        response = await client.get("/api/v1/reports/top-products", params={"limit": 2})
+        assert response.json() == expected
+
+        response = await client.get("/api/v1/reports/top-products", params={"days": 31})
+        assert response.json()[0]["product_id"] == 3
+
+    @pytest.mark.asyncio
+    async def test_invalid_window(self, client: AsyncClient):
+        """Окно должно быть от 1 до 366 дней"""
+        response = await client.get("/api/v1/reports/top-products", params={"days": 0})
+
+        assert response.status_code == 422
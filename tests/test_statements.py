@@ -0,0 +1,71 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from api.core.config import settings
+from api.db import ReplicaRouter, count_statements, get_read_db, get_replica_router
+from api.main import app
+
+
+@pytest.fixture
+def read_db(engine):
+    """Настоящая get_read_db (AUTOCOMMIT) поверх тестовой БД"""
+    app.dependency_overrides.pop(get_read_db, None)
+    app.dependency_overrides[get_replica_router] = lambda: ReplicaRouter(engine, [])
+
+
+class TestStatementCounter:
+    """Тесты числа обращений к БД на запрос"""
+
+    @pytest.mark.asyncio
+    async def test_get_order_single_statement(self, client: AsyncClient, test_data, read_db):
+        """Чтение заказа - один запрос, без BEGIN и COMMIT/ROLLBACK"""
+        with count_statements() as counter:
+            response = await client.get("/api/v1/orders/1")
+
+        assert response.status_code == 200
+        assert response.headers["X-SQL-Statements"] == "1"
+        assert counter.statements == 1
+        assert counter.total == 1
+
+    @pytest.mark.asyncio
+    async def test_add_item_atomic(self, client: AsyncClient, test_data):
+        """Добавление товара - BEGIN, один запрос и COMMIT"""
+        with count_statements() as counter:
+            response = await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": 1, "product_id": 1, "quantity": 1},
+            )
+
+        assert response.status_code == 200
+        assert (counter.begins, counter.statements, counter.commits) == (1, 1, 1)
+        assert counter.total == 3
+
+    @pytest.mark.asyncio
+    async def test_add_item_orm_without_refresh(self, client: AsyncClient, test_data, monkeypatch):
+        """ORM-режим не перечитывает позицию после COMMIT"""
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", "orm")
+
+        with count_statements() as counter:
+            response = await client.post(
+                "/api/v1/orders/add-item",
+                json={"order_id": 1, "product_id": 1, "quantity": 1},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["id"] is not None
+        # 3 SELECT + INSERT позиции + UPDATE остатка, одна транзакция
+        assert counter.statements == 5
+        assert (counter.begins, counter.commits) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_nested_counters(self, engine):
+        """Внешний счетчик видит обращения, посчитанные внутренним"""
+        with count_statements() as outer:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with count_statements() as inner:
+                    await conn.execute(text("SELECT 2"))
+
+        assert inner.statements == 1
+        assert outer.statements == 2
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.core.config import settings
+from api.models import Product
+from api.services import InsufficientStockError, take_stock
+
+
+class TestStockShardsAdmin:
+    """Тесты эндпоинтов /api/v1/admin/products/{product_id}/stock-shards"""
+    
+    @pytest.mark.asyncio
+    async def test_split_stock(self, client: AsyncClient, test_data):
+        """Остаток делится на шарды поровну"""
+        response = await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 3})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["quantity"] == 10
+        assert data["unsharded_quantity"] == 0
+        assert [shard["quantity"] for shard in data["shards"]] == [4, 3, 3]
+    
+    @pytest.mark.asyncio
+    async def test_merge_stock(self, client: AsyncClient, test_data):
+        """Слияние возвращает остаток в products.quantity"""
+        await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 4})
+        response = await client.delete("/api/v1/admin/products/1/stock-shards")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["quantity"] == 10
+        assert data["unsharded_quantity"] == 10
+        assert data["shards"] == []
+    
+    @pytest.mark.asyncio
+    async def test_split_stock_not_found(self, client: AsyncClient, test_data):
+        """Ошибка 404 если товар не существует"""
+        response = await client.put("/api/v1/admin/products/999/stock-shards", json={"shards": 2})
+        
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_total_quantity(self, client: AsyncClient, test_data, db_session):
+        """Product.total_quantity суммирует шарды"""
+        await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 2})
+        
+        row = (await db_session.execute(
+            select(Product.quantity, Product.total_quantity).where(Product.id == 1)
+        )).one()
+        assert tuple(row) == (0, 10)
+
+
+class TestAddItemSharded:
+    """Тесты POST /api/v1/orders/add-item в режиме sharded"""
+    
+    @pytest.fixture(autouse=True)
+    def sharded_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "ADD_ITEM_MODE", "sharded")
+    
+    @pytest.mark.asyncio
+    async def test_add_item_across_shards(self, client: AsyncClient, test_data):
+        """Если ни в одном шарде не хватает остатка, списание идет из нескольких"""
+        await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 4})
+        
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 7}
+        )
+        
+        assert response.status_code == 200
+        stock = (await client.get("/api/v1/admin/products/1/stock")).json()
+        assert stock["quantity"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_add_item_unsharded_product(self, client: AsyncClient, test_data, db_session):
+        """Товар без шардов списывается с products.quantity"""
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 2}
+        )
+        
+        assert response.status_code == 200
+        quantity = await db_session.scalar(select(Product.quantity).where(Product.id == 1))
+        assert quantity == 8
+    
+    @pytest.mark.asyncio
+    async def test_add_item_insufficient_stock(self, client: AsyncClient, test_data):
+        """Ошибка 422 с общим доступным остатком"""
+        await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 4})
+        
+        response = await client.post(
+            "/api/v1/orders/add-item",
+            json={"order_id": 1, "product_id": 1, "quantity": 11}
+        )
+        
+        assert response.status_code == 422
+        assert response.json()["detail"].endswith("доступно: 10")
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_no_oversell(self, client: AsyncClient, engine, test_data):
+        """Параллельные списания с шардов не продают больше остатка"""
+        await client.put("/api/v1/admin/products/1/stock-shards", json={"shards": 4})
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        
+        async def take():
+            async with session_factory() as session:
+                try:
+                    await take_stock(session, 1, 1)
+                    await session.commit()
+                    return True
+                except InsufficientStockError:
+                    return False
+        
+        results = await asyncio.gather(*(take() for _ in range(15)))
+        
+        assert sum(results) == 10
+        stock = (await client.get("/api/v1/admin/products/1/stock")).json()
+        assert stock["quantity"] == 0